@@ -14,6 +14,9 @@ import logging
 import shutil
 import platform
 import tempfile
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up logging
 logging.basicConfig(
@@ -22,97 +25,158 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Persistent cache shared across builds (not removed by clean_build_files)
+BUILD_CACHE_DIR = os.path.join(os.getcwd(), ".build_cache")
+WHEEL_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, "wheels")
+# Separate wheelhouse for the CUDA llama-cpp-python build, which has the same file name as the CPU build
+CUDA_WHEEL_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, "wheels-cuda")
+PYINSTALLER_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, "pyinstaller")
+
+# PyInstaller analysis of the torch/CUDA tree can take a long time
+PYINSTALLER_TIMEOUT = 2 * 60 * 60
+
+# Distributable folders (relative to the project root) packaged by NSIS
+PYINSTALLER_PAYLOAD_DIR = "dist\\git-explain"
+NUITKA_PAYLOAD_DIR = "dist\\app_launcher.dist"
+
+def _remove_build_file(file_path):
+    """Remove a single build file, ignoring it if it does not exist"""
+    try:
+        os.unlink(file_path)
+        logger.info(f"Removed file: {file_path}")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Error removing {file_path}: {e}")
+
 def clean_build_files():
     """Clean previous build files before starting a new build"""
     logger.info("Cleaning previous build files...")
     
-    # Clean PyInstaller cache and build directories
-    for dir_name in ["build", "dist", "__pycache__"]:
-        dir_path = os.path.join(os.getcwd(), dir_name)
-        if os.path.exists(dir_path):
-            logger.info(f"Removing directory: {dir_path}")
-            try:
-                shutil.rmtree(dir_path)
-            except Exception as e:
-                logger.warning(f"Error removing {dir_path}: {e}")
-    
-    # Remove previous build files
-    for file_name in ["git_explain.spec", "installer.nsi", "gpu_detector.nsh", "Git_Explain_Setup.exe"]:
-        file_path = os.path.join(os.getcwd(), file_name)
-        if os.path.exists(file_path):
-            logger.info(f"Removing file: {file_path}")
-            try:
-                os.remove(file_path)
-            except Exception as e:
-                logger.warning(f"Error removing {file_path}: {e}")
+    # Clean PyInstaller cache and build directories, and previous build files.
+    # The removals are independent and I/O bound, so they run in parallel.
+    dir_paths = [os.path.join(os.getcwd(), name) for name in ("build", "dist", "__pycache__")]
+    file_paths = [
+        os.path.join(os.getcwd(), name)
+        for name in ("git_explain.spec", "installer.nsi", "gpu_detector.nsh", "Git_Explain_Setup.exe")
+    ]
+    with ThreadPoolExecutor(max_workers=len(dir_paths)) as executor:
+        file_results = executor.map(_remove_build_file, file_paths)
+        list(executor.map(lambda path: shutil.rmtree(path, ignore_errors=True), dir_paths))
+        list(file_results)
 
     # Clean NSIS temporary files (important to avoid the mmapping error)
     temp_dir = tempfile.gettempdir()
-    if temp_dir and os.path.exists(temp_dir):
+    if temp_dir:
         try:
-            for file_name in os.listdir(temp_dir):
-                # NSIS temp files often start with "ns"
-                if file_name.startswith("ns") and len(file_name) <= 8:
-                    file_path = os.path.join(temp_dir, file_name)
-                    try:
-                        os.remove(file_path)
-                        logger.info(f"Removed NSIS temp file: {file_path}")
-                    except Exception as e:
-                        logger.warning(f"Could not remove temp file {file_path}: {e}")
-        except Exception as e:
+            with os.scandir(temp_dir) as entries:
+                for entry in entries:
+                    # NSIS temp files often start with "ns"
+                    name = entry.name
+                    if name.startswith("ns") and len(name) <= 8:
+                        try:
+                            os.unlink(entry.path)
+                            logger.info(f"Removed NSIS temp file: {entry.path}")
+                        except OSError as e:
+                            logger.warning(f"Could not remove temp file {entry.path}: {e}")
+        except OSError as e:
             logger.warning(f"Error cleaning temp directory: {e}")
 
+# Resolved makensis path, cached by check_nsis()
+_makensis_path = None
+
 def check_nsis():
-    """Check if NSIS is installed and in PATH"""
-    try:
-        subprocess.run(['makensis', '/VERSION'], check=True, 
-                      stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        logger.info("✓ NSIS is installed and available")
-        return True
-    except (subprocess.SubprocessError, FileNotFoundError):
-        logger.error("✗ NSIS (makensis) not found in PATH")
-        logger.error("  Please install NSIS and make sure it's in your PATH")
-        logger.error("  Download from: https://nsis.sourceforge.io/Download")
-        return False
+    """Check if NSIS is installed and in PATH, returning the makensis path or None"""
+    global _makensis_path
+    if _makensis_path is None:
+        _makensis_path = shutil.which('makensis')
+    
+    if _makensis_path:
+        logger.info(f"✓ NSIS is installed and available: {_makensis_path}")
+        return _makensis_path
+    
+    logger.error("✗ NSIS (makensis) not found in PATH")
+    logger.error("  Please install NSIS and make sure it's in your PATH")
+    logger.error("  Download from: https://nsis.sourceforge.io/Download")
+    return None
+
+def _pins_hash(wheel_args, wheel_dir, env=None):
+    """Hash the wheel arguments and build settings together with the project's dependency files"""
+    cmake_args = (env or os.environ).get("CMAKE_ARGS", "")
+    digest = hashlib.sha256("\0".join([*wheel_args, wheel_dir, cmake_args]).encode("utf-8"))
+    # pip resolves "." from pyproject.toml, which can change without a re-lock
+    for name in ("pyproject.toml", "poetry.lock"):
+        dep_file = os.path.join(os.getcwd(), name)
+        if os.path.exists(dep_file):
+            with open(dep_file, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def pip_install_cached(wheel_args, install_args, env=None, wheel_dir=WHEEL_CACHE_DIR):
+    """
+    Install packages from a local wheelhouse, WHEEL_CACHE_DIR by default.
+    
+    The wheelhouse is filled with pip wheel rather than pip download, so
+    sdist-only packages such as llama-cpp-python are built once and stored as
+    wheels; the offline install then never needs their build backends. Wheels
+    are only rebuilt when the pins change; a marker file keyed by the hash of
+    the arguments, pyproject.toml and poetry.lock records a completed fill so
+    unchanged pins skip the network entirely.
+    """
+    os.makedirs(wheel_dir, exist_ok=True)
+    marker = os.path.join(BUILD_CACHE_DIR, f"pins-{_pins_hash(wheel_args, wheel_dir, env)}.ok")
+    
+    if os.path.exists(marker):
+        logger.info(f"Pins unchanged, using cached wheels for: {' '.join(install_args)}")
+    else:
+        subprocess.run(["pip", "wheel", "--wheel-dir", wheel_dir, *wheel_args],
+                       check=True, env=env)
+        with open(marker, 'w') as f:
+            f.write(" ".join(wheel_args))
+    
+    subprocess.run(["pip", "install", "--no-index", "--find-links", wheel_dir, *install_args],
+                   check=True, env=env)
 
 def install_dependencies(include_gpu=True):
     """Install all dependencies needed for both CPU and GPU operation"""
     logger.info("Installing dependencies...")
     
-    # Install base dependencies first
+    # Install base dependencies first (the build backend is added to the
+    # wheelhouse too so the editable install can build offline)
     try:
-        subprocess.run(["pip", "install", "-e", "."], check=True)
+        pip_install_cached([".", "poetry-core>=2.0.0,<3.0.0"], ["-e", "."])
         logger.info("Base dependencies installed successfully")
     except Exception as e:
         logger.error(f"Error installing base dependencies: {e}")
         return False
     
+    if platform.system() == "Windows":
+        # Newer pefile releases make PyInstaller's binary dependency scan much slower
+        try:
+            pip_install_cached(["pefile<2024.8.26"], ["pefile<2024.8.26"])
+        except Exception as e:
+            logger.warning(f"Could not pin pefile, PyInstaller may be slower: {e}")
+    
     if include_gpu:
         try:
             # Install PyTorch with CUDA support
             logger.info("Installing PyTorch with CUDA support...")
-            if platform.system() == "Windows":
-                torch_cmd = "pip install torch --extra-index-url https://download.pytorch.org/whl/cu118/"
-            else:
-                torch_cmd = "pip install torch --extra-index-url https://download.pytorch.org/whl/cu118/"
-                
-            subprocess.run(torch_cmd.split(), check=True)
+            torch_index = "https://download.pytorch.org/whl/cu118/"
+            pip_install_cached(["torch", "--extra-index-url", torch_index], ["torch"])
             
             # Install FAISS GPU
             logger.info("Installing FAISS GPU...")
-            subprocess.run(["pip", "install", "faiss-gpu", "--force-reinstall"], check=True)
+            pip_install_cached(["faiss-gpu"], ["faiss-gpu"])
             
-            # Install llama-cpp-python with CUDA
+            # Install llama-cpp-python with CUDA. The CPU build from the base
+            # install has to be replaced, so only this package is reinstalled.
             logger.info("Installing llama-cpp-python with CUDA...")
-            env = os.environ.copy()
-            env["CMAKE_ARGS"] = "-DLLAMA_CUBLAS=on"
-            
-            if platform.system() == "Windows":
-                # Windows needs a different approach
-                os.environ["CMAKE_ARGS"] = "-DLLAMA_CUBLAS=on"
-                subprocess.run(["pip", "install", "--force-reinstall", "llama-cpp-python"], check=True)
-            else:
-                subprocess.run(["pip", "install", "--force-reinstall", "llama-cpp-python"], env=env, check=True)
+            # CMAKE_ARGS is passed only to this pip call so it doesn't leak into later builds
+            env = {**os.environ, "CMAKE_ARGS": "-DLLAMA_CUBLAS=on"}
+            # --no-cache-dir keeps pip from reusing its cached CPU build of the sdist
+            pip_install_cached(["--no-cache-dir", "--no-deps", "llama-cpp-python"],
+                               ["--force-reinstall", "--no-deps", "llama-cpp-python"],
+                               env=env, wheel_dir=CUDA_WHEEL_CACHE_DIR)
             
             logger.info("GPU dependencies installed successfully")
             return True
@@ -123,14 +187,20 @@ def install_dependencies(include_gpu=True):
     
     return True
 
-def create_spec_file():
-    """Create the PyInstaller spec file for both CPU and GPU support"""
+def create_spec_file(include_runtime_imports=False):
+    """
+    Create the PyInstaller spec file for both CPU and GPU support.
+    
+    The ML libraries are only listed as hidden imports when include_runtime_imports
+    is set; otherwise PyInstaller picks up what the application modules import.
+    """
     spec_content = """# -*- mode: python ; coding: utf-8 -*-
 from PyInstaller.utils.hooks import collect_data_files, collect_submodules
 import os
 import sys
 
 block_cipher = None
+include_runtime_imports = __INCLUDE_RUNTIME_IMPORTS__
 
 # Get the current directory
 current_dir = os.getcwd()
@@ -151,32 +221,24 @@ for dir_path in [
 ]:
     os.makedirs(dir_path, exist_ok=True)
 
-# Collect imports for the app
+# Collect imports for the app. Only modules reachable from the launcher at
+# startup are listed; everything else is found through the src.* modules.
 hidden_imports = []
 
-# Core Python modules
-hidden_imports += [
-    'threading', 'webbrowser', 'json', 'logging', 'pathlib',
-    'tempfile', 'shutil', 'glob', 'ast', 're', 'pickle',
-]
-
 # Web and UI related
 hidden_imports += [
-    'flask', 'flask.templating', 'werkzeug', 'jinja2', 'webview',
+    'flask', 'flask.templating', 'werkzeug', 'jinja2', 'webview', 'waitress',
     'engineio.async_drivers.threading',
 ]
 
-# Network and API
-hidden_imports += [
-    'requests', 'httpx', 'urllib3'
-]
-
-# ML and data processing - include both CPU and GPU variants for compatibility
-hidden_imports += [
-    'numpy', 'torch', 'transformers', 
-    'huggingface_hub', 'sentence_transformers', 'llama_cpp',
+# Runtime-loaded ML modules, only forced into the bundle when requested
+runtime_hidden_imports = [
+    'numpy', 'torch', 'transformers',
+    'huggingface_hub', 'hf_transfer', 'sentence_transformers', 'llama_cpp',
     'faiss'  # Include both CPU and GPU versions
 ]
+if include_runtime_imports:
+    hidden_imports += runtime_hidden_imports
 
 # Git handling
 hidden_imports += ['git', 'gitdb']
@@ -235,7 +297,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,  # UPX decompression on every launch slows startup
     upx_exclude=[],
     runtime_tmpdir=None,
     console=True,
@@ -246,7 +308,8 @@ exe = EXE(
     entitlements_file=None
 )
 
-# Create the distributable folder
+# Create the distributable folder (onedir; never switch to onefile, which
+# re-extracts the whole bundle to a temp dir on every launch)
 coll = COLLECT(
     exe,
     a.binaries,
@@ -258,6 +321,7 @@ coll = COLLECT(
     name='git-explain'
 )
 """
+    spec_content = spec_content.replace("__INCLUDE_RUNTIME_IMPORTS__", repr(bool(include_runtime_imports)))
     
     spec_file = os.path.join(os.getcwd(), "git_explain.spec")
     with open(spec_file, 'w') as f:
@@ -304,29 +368,17 @@ RequestExecutionLevel admin
 ; Variables
 Var HasGPU
 
-; Simple GPU detection approach using a system call
+; GPU detection via a registry query (no WMI startup or temp file)
 Function DetectNvidiaGPU
-  ; Create a temporary file
-  GetTempFileName $0
-  
-  ; Execute a simple system command to check for NVIDIA GPUs
-  nsExec::ExecToStack 'cmd.exe /c "wmic path win32_VideoController get name | findstr /i NVIDIA > $0"'
+  ; The NVIDIA driver creates this key; reg query exits 0 when it exists
+  nsExec::ExecToStack 'reg query "HKLM\\SOFTWARE\\NVIDIA Corporation"'
   Pop $1 ; Return value
   Pop $2 ; Console output
   
-  ; Check if the file has content (NVIDIA GPU was found)
-  FileOpen $3 $0 r
-  FileRead $3 $4
-  FileClose $3
-  
-  ; Delete the temporary file
-  Delete $0
-  
-  ; Check if we found NVIDIA in the output
-  ${If} $4 == ""
-    Push "false"
-  ${Else}
+  ${If} $1 == 0
     Push "true"
+  ${Else}
+    Push "false"
   ${EndIf}
 FunctionEnd
 
@@ -412,32 +464,191 @@ SectionEnd
     logger.info(f"Created NSIS installer script: {nsis_file}")
     return nsis_file
 
-def build_installer():
-    """Build the installer using PyInstaller and NSIS with minimal complexity"""
+def _hash_directory(dir_path):
+    """Hash the relative paths and contents of every file under dir_path"""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(dir_path):
+        dirs.sort()
+        for file_name in sorted(files):
+            file_path = os.path.join(root, file_name)
+            digest.update(os.path.relpath(file_path, dir_path).encode("utf-8"))
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+    return digest.hexdigest()
+
+def _find_nsis_plugin(makensis, plugin_dll):
+    """
+    Find an NSIS plugin DLL in the Plugins directory of the given makensis install.
+    
+    The generated script is ANSI, so plugins are looked up in Plugins\\x86-ansi
+    (NSIS 3) and directly in Plugins (NSIS 2). Returns the DLL path or None.
+    """
+    makensis_dir = os.path.dirname(os.path.realpath(makensis))
+    nsis_dirs = [
+        makensis_dir,
+        os.path.dirname(makensis_dir),  # makensis in the Bin subdirectory
+        os.path.join(os.path.dirname(makensis_dir), 'share', 'nsis')  # Unix installs
+    ]
+    for nsis_dir in nsis_dirs:
+        for plugins_dir in (os.path.join(nsis_dir, 'Plugins', 'x86-ansi'), os.path.join(nsis_dir, 'Plugins')):
+            plugin_path = os.path.join(plugins_dir, plugin_dll)
+            if os.path.isfile(plugin_path):
+                return plugin_path
+    return None
+
+def create_payload_archive(payload_dir):
+    """
+    Pack the distributable folder into a 7z archive with multi-threaded LZMA2.
+    
+    The archive is kept in BUILD_CACHE_DIR and only rebuilt when the folder
+    contents change. Returns the archive path, or None if 7-Zip is not
+    available (the NSIS script then falls back to File /r).
+    """
+    seven_zip = shutil.which("7z") or shutil.which("7za")
+    if not seven_zip:
+        logger.warning("7-Zip not found in PATH, NSIS will compress the files itself")
+        return None
+    
+    archive_path = os.path.join(BUILD_CACHE_DIR, "payload.7z")
+    key_file = os.path.join(BUILD_CACHE_DIR, "payload.key")
+    payload_key = _hash_directory(payload_dir)
+    try:
+        with open(key_file, 'r') as f:
+            if f.read().strip() == payload_key and os.path.exists(archive_path):
+                logger.info("Payload unchanged, reusing cached 7z archive")
+                return archive_path
+    except OSError:
+        pass
+    
+    logger.info("Creating 7z payload archive...")
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    try:
+        os.unlink(archive_path)
+    except FileNotFoundError:
+        pass
+    subprocess.run([seven_zip, 'a', '-t7z', '-mmt=on', '-mx=9', archive_path,
+                    os.path.join(payload_dir, '*')], check=True)
+    with open(key_file, 'w') as f:
+        f.write(payload_key)
+    return archive_path
+
+def run_makensis(makensis, nsis_file):
+    """Run makensis in verbose mode, logging its output as it is produced, and return the exit code"""
+    process = subprocess.Popen([makensis, '/V4', nsis_file],
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT,
+                               text=True,
+                               bufsize=1)
+    for line in process.stdout:
+        logger.info(f"nsis: {line.rstrip()}")
+    return process.wait()
+
+def _pyinstaller_cache_key(spec_file):
+    """Hash poetry.lock and the spec file to decide whether the PyInstaller cache is still valid"""
+    digest = hashlib.sha256()
+    for path in (os.path.join(os.getcwd(), "poetry.lock"), spec_file):
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+def build_with_pyinstaller(spec_file):
+    """Run PyInstaller on the spec file to create the onedir distributable"""
+    logger.info("Running PyInstaller to create distributable files...")
+    pyinstaller_cmd = [
+        sys.executable, '-m', 'PyInstaller',
+        spec_file,
+        '--noconfirm'
+    ]
+    
+    # Only discard PyInstaller's analysis cache when the pins or the spec changed
+    cache_key = _pyinstaller_cache_key(spec_file)
+    key_file = os.path.join(BUILD_CACHE_DIR, "pyi.key")
+    try:
+        with open(key_file, 'r') as f:
+            cached_key = f.read().strip()
+    except OSError:
+        cached_key = None
+    if cached_key != cache_key:
+        logger.info("Dependencies or spec changed, running a clean PyInstaller build")
+        pyinstaller_cmd.append('--clean')
+    
+    # Keep PyInstaller's cache under .build_cache so it survives clean_build_files();
+    # output is not captured so progress streams to the console
+    pyinstaller_env = os.environ.copy()
+    pyinstaller_env["PYINSTALLER_CONFIG_DIR"] = PYINSTALLER_CACHE_DIR
+    subprocess.run(pyinstaller_cmd, check=True, env=pyinstaller_env, timeout=PYINSTALLER_TIMEOUT)
+    
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    with open(key_file, 'w') as f:
+        f.write(cache_key)
+
+def build_with_nuitka():
+    """
+    Compile the launcher ahead of time with Nuitka into a standalone folder.
+    
+    Experimental: this build has not been run end to end yet; PyInstaller stays the default.
+    """
+    logger.info("Running Nuitka to create distributable files...")
+    logger.warning("The Nuitka build is experimental and has not been verified end to end")
+    nuitka_cmd = [
+        sys.executable, '-m', 'nuitka',
+        '--standalone',
+        '--onefile=no',
+        '--lto=yes',
+        '--enable-plugin=anti-bloat',
+        '--include-package=src',
+        '--include-package=flask',
+        '--include-package=webview',
+        # Same layout as the source tree: main.py serves the UI from src/ui next to itself
+        '--include-data-dir=src/ui/templates=src/ui/templates',
+        '--include-data-dir=src/ui/static=src/ui/static',
+        '--output-filename=git-explain',
+        '--output-dir=dist',
+        'src/app_launcher.py'
+    ]
+    # main.py imports its siblings as top-level modules ("config", "github.repo", ...),
+    # so src has to be on the path for Nuitka to follow those imports
+    nuitka_env = os.environ.copy()
+    src_dir = os.path.join(os.getcwd(), "src")
+    nuitka_env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_dir, nuitka_env.get("PYTHONPATH")]))
+    subprocess.run(nuitka_cmd, check=True, env=nuitka_env, timeout=PYINSTALLER_TIMEOUT)
+
+def build_installer(engine="pyinstaller"):
+    """
+    Build the installer using PyInstaller (or Nuitka) and NSIS with minimal complexity.
+    
+    engine="nuitka" compiles the launcher with Nuitka and falls back to
+    PyInstaller if that fails.
+    """
     try:
         # Clean up before starting
         clean_build_files()
         
         # Check NSIS first
-        if not check_nsis():
+        makensis = check_nsis()
+        if not makensis:
             return False
         
         # Install all dependencies (including both CPU and GPU versions)
         if not install_dependencies(include_gpu=True):
             logger.warning("Some GPU dependencies could not be installed, but will continue with build")
         
-        # Create spec file for both CPU and GPU support
-        spec_file = create_spec_file()
+        payload_dir = None
+        if engine == "nuitka":
+            try:
+                build_with_nuitka()
+                payload_dir = NUITKA_PAYLOAD_DIR
+            except Exception as e:
+                logger.error(f"Nuitka build failed: {e}")
+                logger.warning("Falling back to PyInstaller")
         
-        # Run PyInstaller
-        logger.info("Running PyInstaller to create distributable files...")
-        pyinstaller_cmd = [
-            sys.executable, '-m', 'PyInstaller',
-            spec_file,
-            '--clean', 
-            '--noconfirm'
-        ]
-        subprocess.run(pyinstaller_cmd, check=True)
+        if payload_dir is None:
+            # Create spec file for both CPU and GPU support
+            spec_file = create_spec_file()
+            build_with_pyinstaller(spec_file)
+            payload_dir = PYINSTALLER_PAYLOAD_DIR
         
         # Create a very basic NSIS script - no GPU detection at all
         logger.info("Creating basic NSIS installer script...")
@@ -457,7 +668,7 @@ RequestExecutionLevel admin
 
 Section
     SetOutPath "$INSTDIR"
-    File /r "dist\\git-explain\\*.*"
+__INSTALL_PAYLOAD__
     
     ; Create a basic GPU info file - always set to true for now
     ; The app will detect GPU availability at runtime
@@ -474,36 +685,36 @@ Section "Uninstall"
     Delete "$DESKTOP\\Git Explain.lnk"
 SectionEnd
 """
+        # The Nsis7z plugin isn't part of stock NSIS; without it NSIS compresses the files itself
+        payload_archive = None
+        if _find_nsis_plugin(makensis, "nsis7z.dll"):
+            payload_archive = create_payload_archive(payload_dir)
+        else:
+            logger.warning("Nsis7z plugin not found in the NSIS Plugins directory, NSIS will compress the files itself")
+        if payload_archive:
+            # Embed the pre-built archive as a single file, stored as is since it is already
+            # LZMA2-compressed, and unpack it with the Nsis7z plugin
+            install_payload = (
+                '    SetCompress off\n'
+                f'    File "{payload_archive}"\n'
+                '    SetCompress auto\n'
+                '    Nsis7z::ExtractWithDetails "$INSTDIR\\payload.7z" "Extracting %s..."\n'
+                '    Delete "$INSTDIR\\payload.7z"'
+            )
+        else:
+            install_payload = f'    File /r "{payload_dir}\\*.*"'
+        nsis_content = nsis_content.replace("__INSTALL_PAYLOAD__", install_payload)
         
         nsis_file = os.path.join(os.getcwd(), "installer.nsi")
         with open(nsis_file, 'w') as f:
             f.write(nsis_content)
         
-        # Run NSIS with diagnostics
+        # Run NSIS once with verbose output streamed line by line, so long
+        # compression runs neither block on a full pipe nor need a timeout
         logger.info("Creating installer with NSIS (basic version)...")
-        
-        try:
-            # First try with verbose logging to see the issue
-            logger.info("Running NSIS with verbose logging...")
-            verbose_output = subprocess.run(['makensis', '/V4', nsis_file], 
-                                          capture_output=True, 
-                                          text=True, 
-                                          timeout=60)
-            logger.info(f"NSIS verbose output: {verbose_output.stdout}")
-            if verbose_output.stderr:
-                logger.warning(f"NSIS errors: {verbose_output.stderr}")
-                
-            # Then try normal build with shorter timeout 
-            logger.info("Running normal NSIS build...")
-            subprocess.run(['makensis', nsis_file], check=True, timeout=120)
-        except subprocess.TimeoutExpired:
-            logger.error("NSIS process timed out, trying with maximum compression")
-            # Try one more time with minimum compression to speed up
-            try:
-                subprocess.run(['makensis', '/X"SetCompressor /FINAL zlib"', nsis_file], check=True, timeout=120)
-            except subprocess.TimeoutExpired:
-                logger.error("NSIS process timed out again. Build failed.")
-                return False
+        if run_makensis(makensis, nsis_file) != 0:
+            logger.error("✗ NSIS failed. See output above.")
+            return False
         
         # Check if installer was created
         installer_path = os.path.join(os.getcwd(), "Git_Explain_Setup.exe")
@@ -520,14 +731,24 @@ SectionEnd
         logger.error(f"Error building installer: {e}")
         return False
 
-if __name__ == "__main__":
+def main():
+    """Command line entry point for the installer builder"""
+    parser = argparse.ArgumentParser(description="Git Explain Installer Builder")
+    parser.add_argument("--engine", choices=["pyinstaller", "nuitka"], default="pyinstaller",
+                        help="Tool used to build the distributable (default: pyinstaller; "
+                             "nuitka is experimental)")
+    args = parser.parse_args()
+    
     print("=" * 70)
     print("Git Explain Installer Builder")
     print("=" * 70)
     
-    if build_installer():
+    if build_installer(engine=args.engine):
         print("\n✓ Installer built successfully!")
         sys.exit(0)
     else:
         print("\n✗ Failed to build installer. See errors above.")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
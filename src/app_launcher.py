@@ -8,35 +8,49 @@ WIP the installer portions do not work yet
 """
 
 import os
+import re
 import sys
 import threading
 import time
 import traceback
-import webview
 import atexit
+import functools
+import importlib.util
+import textwrap
 import logging
+import multiprocessing
 import subprocess
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 # Setup logging to a file for debugging
 def setup_logging():
-    log_dir = os.path.expanduser("~")
+    global _logging_configured
+    if _logging_configured:
+        return logger
+    _logging_configured = True
+    
     app_data_dir = get_app_data_dir()
     os.makedirs(app_data_dir, exist_ok=True)
     
     log_file = os.path.join(app_data_dir, "github-repo-analyzer.log")
+    # delay=True defers opening the log file until the first record is written
     logging.basicConfig(
-        level=logging.DEBUG,
+        level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
-            logging.FileHandler(log_file),
+            RotatingFileHandler(log_file, maxBytes=5 * 1024 * 1024, backupCount=2, delay=True),
             logging.StreamHandler()
         ]
     )
-    return logging.getLogger('launcher')
+    logger.info("="*50)
+    logger.info("Starting GitHub Repository Analyzer")
+    logger.info(f"Python version: {sys.version}")
+    logger.info(f"Current working directory: {os.getcwd()}")
+    return logger
 
-def get_app_data_dir():
-    """Return the appropriate directory for app data based on platform"""
+def _compute_app_data_dir():
+    """Compute the appropriate directory for app data based on platform"""
     if sys.platform == 'win32':
         app_data = os.environ.get('APPDATA', os.path.expanduser("~"))
         return os.path.join(app_data, "GitHubRepoAnalyzer")
@@ -45,40 +59,57 @@ def get_app_data_dir():
     else:  # Linux and other Unix-like
         return os.path.expanduser("~/.config/github-repo-analyzer")
 
-# Initialize logger
-logger = setup_logging()
+# The platform never changes within a process, so resolve the directory once
+_APP_DATA_DIR = _compute_app_data_dir()
 
-logger.info("="*50)
-logger.info("Starting GitHub Repository Analyzer")
-logger.info(f"Python version: {sys.version}")
-logger.info(f"Current working directory: {os.getcwd()}")
+def get_app_data_dir():
+    """Return the appropriate directory for app data based on platform"""
+    return _APP_DATA_DIR
 
-def check_gpu_availability():
-    """Check if a CUDA-compatible GPU is available"""
-    # First check if we're running from an installer that detected GPU
-    # This ensures consistent behavior between build time and runtime
+# Launcher logger; stays silent until setup_logging() installs the real handlers
+logger = logging.getLogger('launcher')
+logger.addHandler(logging.NullHandler())
+_logging_configured = False
+
+def _show_error(message):
+    """Let the user see an error: prompt on a console, otherwise show a dialog (Windows) or write to stderr"""
     try:
-        # Check for GPU info file created during installation
-        gpu_info_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gpu_info.txt')
-        if os.path.exists(gpu_info_path):
-            with open(gpu_info_path, 'r') as f:
-                content = f.read()
-                if 'GPU_DETECTED=true' in content.lower():
-                    logger.info("GPU was detected during installation")
-                    os.environ["GITHUB_ANALYZER_GPU_AVAILABLE"] = "1"
-                    return True, {"name": "GPU detected at install time"}
-                elif 'GPU_DETECTED=false' in content.lower():
-                    logger.info("No GPU was detected during installation")
-                    os.environ["GITHUB_ANALYZER_GPU_AVAILABLE"] = "0"
-                    return False, None
-    except Exception as e:
-        logger.warning(f"Error checking installer GPU detection: {e}")
+        if sys.stdin is not None and sys.stdin.isatty():
+            print(message)
+            input("Press Enter to exit...")
+            return
+    except (EOFError, OSError, ValueError):
+        pass
     
-    # Fallback to runtime detection
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            ctypes.windll.user32.MessageBoxW(None, message, "GitHub Repository Analyzer", 0x10)
+            return
+        except Exception:
+            pass
+    if sys.stderr is not None:
+        print(message, file=sys.stderr)
+
+def _fatal(message):
+    """Report a fatal error and exit immediately, skipping atexit handlers"""
+    _show_error(message)
+    logging.shutdown()
+    os._exit(1)
+
+# Parses the GPU_DETECTED=true/false line written to gpu_info.txt by the installer
+_GPU_INFO_RE = re.compile(rb'gpu_detected=(true|false)', re.IGNORECASE)
+
+def _runtime_gpu_probe():
+    """Probe for a GPU via PyTorch, then llama-cpp-python; only used without an installer result"""
     try:
         import torch
-        if torch.cuda.is_available():
-            gpu_name = torch.cuda.get_device_name(0) if torch.cuda.device_count() > 0 else "Unknown GPU"
+        cuda_available = torch.cuda.is_available()
+        if cuda_available:
+            try:
+                gpu_name = torch.cuda.get_device_name(0)
+            except Exception:
+                gpu_name = "Unknown GPU"
             cuda_version = torch.version.cuda
             logger.info(f"GPU available: {gpu_name} (CUDA {cuda_version})")
             
@@ -91,33 +122,70 @@ def check_gpu_availability():
             }
         else:
             logger.info("GPU not available via PyTorch CUDA")
+        torch_checked = True
     except ImportError:
         logger.warning("PyTorch not available for GPU check")
+        torch_checked = False
     except Exception as e:
         logger.warning(f"Error checking GPU availability: {e}")
+        torch_checked = False
     
-    # Check if llama-cpp-python has CUDA support as a fallback
-    try:
-        import llama_cpp
-        has_cublas = getattr(llama_cpp, "has_cublas", False)
-        if has_cublas:
-            logger.info("llama-cpp-python has CUDA support")
-            os.environ["GITHUB_ANALYZER_GPU_AVAILABLE"] = "1"
-            return True, {"name": "Unknown GPU (llama-cpp CUDA support)"}
-    except ImportError:
-        logger.warning("llama-cpp-python not available for GPU check")
-    except Exception as e:
-        logger.warning(f"Error checking llama-cpp GPU support: {e}")
+    # Check if llama-cpp-python has CUDA support as a fallback. Importing it loads
+    # its native library, so skip it when torch already answered the question.
+    if not torch_checked:
+        try:
+            if importlib.util.find_spec("llama_cpp") is None:
+                raise ImportError("llama_cpp is not installed")
+            import llama_cpp
+            supports_gpu_offload = getattr(llama_cpp, "llama_supports_gpu_offload", None)
+            if supports_gpu_offload is not None:
+                has_cublas = bool(supports_gpu_offload())
+            else:
+                has_cublas = getattr(llama_cpp, "has_cublas", False)
+            if has_cublas:
+                logger.info("llama-cpp-python has CUDA support")
+                os.environ["GITHUB_ANALYZER_GPU_AVAILABLE"] = "1"
+                return True, {"name": "Unknown GPU (llama-cpp CUDA support)"}
+        except ImportError:
+            logger.warning("llama-cpp-python not available for GPU check")
+        except Exception as e:
+            logger.warning(f"Error checking llama-cpp GPU support: {e}")
     
     # GPU not available
     os.environ["GITHUB_ANALYZER_GPU_AVAILABLE"] = "0"
     logger.info("No GPU detected, will use CPU only")
     return False, None
 
-# Check GPU before starting the application
-has_gpu, gpu_info = check_gpu_availability()
+@functools.lru_cache(maxsize=1)
+def check_gpu_availability():
+    """Check if a CUDA-compatible GPU is available (probed once, then cached)"""
+    # First check if we're running from an installer that detected GPU
+    # This ensures consistent behavior between build time and runtime,
+    # and answers without importing torch or llama_cpp
+    try:
+        # Check for GPU info file created during installation
+        # The file holds a single short line, so a small binary read is enough
+        gpu_info_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gpu_info.txt')
+        with open(gpu_info_path, 'rb') as f:
+            content = f.read(128)
+        match = _GPU_INFO_RE.search(content)
+        if match and match.group(1).lower() == b'true':
+            logger.info("GPU was detected during installation")
+            os.environ["GITHUB_ANALYZER_GPU_AVAILABLE"] = "1"
+            return True, {"name": "GPU detected at install time"}
+        elif match and match.group(1).lower() == b'false':
+            logger.info("No GPU was detected during installation")
+            os.environ["GITHUB_ANALYZER_GPU_AVAILABLE"] = "0"
+            return False, None
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Error checking installer GPU detection: {e}")
+    
+    # Fallback to runtime detection
+    return _runtime_gpu_probe()
 
-# Determine if we're running in a PyInstaller bundle, installed via pip, or development mode
+# Determine if we're running in a PyInstaller bundle, a Nuitka build, installed via pip, or development mode
 def get_application_mode():
     if getattr(sys, 'frozen', False):
         # Running in a PyInstaller bundle
@@ -126,6 +194,15 @@ def get_application_mode():
         static_folder = base_dir / "ui" / "static"
         template_folder = base_dir / "ui" / "templates"
         mode = "bundle"
+    elif "__compiled__" in globals():
+        # Running as a Nuitka standalone build, which sets neither sys.frozen nor sys._MEIPASS;
+        # the data files keep the source tree layout next to the executable
+        logger.info("Running as Nuitka build")
+        base_dir = Path(os.path.dirname(os.path.abspath(sys.executable)))
+        src_dir = base_dir / "src"
+        static_folder = src_dir / "ui" / "static"
+        template_folder = src_dir / "ui" / "templates"
+        mode = "bundle"
     else:
         # Development mode
         logger.info("Running in development mode")
@@ -137,12 +214,16 @@ def get_application_mode():
     
     # Log the detected paths
     logger.info(f"Base dir: {base_dir}")
-    logger.info(f"Static folder exists: {static_folder.exists()}")
-    logger.info(f"Template folder exists: {template_folder.exists()}")
-    if static_folder.exists():
-        logger.info(f"Static folder contents: {list(static_folder.iterdir())}")
-    if template_folder.exists():
-        logger.info(f"Template folder contents: {list(template_folder.iterdir())}")
+    # One stat per folder, reused for every check below
+    static_exists = os.path.isdir(static_folder)
+    template_exists = os.path.isdir(template_folder)
+    logger.info(f"Static folder exists: {static_exists}")
+    logger.info(f"Template folder exists: {template_exists}")
+    if logger.isEnabledFor(logging.DEBUG):
+        if static_exists:
+            logger.debug(f"Static folder contents: {list(static_folder.iterdir())}")
+        if template_exists:
+            logger.debug(f"Template folder contents: {list(template_folder.iterdir())}")
     
     return {
         "mode": mode,
@@ -151,9 +232,9 @@ def get_application_mode():
         "template_folder": template_folder
     }
 
-app_info = get_application_mode()
-MODE = app_info["mode"]
-BASE_DIR = app_info["base_dir"]
+# Marker written once the data directories exist, re-checked after DIRS_READY_MAX_AGE seconds
+DIRS_READY_MARKER = ".dirs_ready"
+DIRS_READY_MAX_AGE = 24 * 60 * 60
 
 # Create a portable data directory structure
 def ensure_data_dirs():
@@ -168,106 +249,155 @@ def ensure_data_dirs():
         "models": os.path.join(app_data_dir, "data", "models")
     }
     
-    for name, path in data_dirs.items():
-        os.makedirs(path, exist_ok=True)
-        logger.info(f"Ensured {name} directory exists: {path}")
+    # Skip the makedirs pass when a recent marker shows it already ran
+    marker = os.path.join(data_dirs["data"], DIRS_READY_MARKER)
+    try:
+        if time.time() - os.stat(marker).st_mtime < DIRS_READY_MAX_AGE:
+            return data_dirs
+    except OSError:
+        pass
+    
+    try:
+        makedirs = os.makedirs
+        for path in data_dirs.values():
+            makedirs(path, exist_ok=True)
+        with open(marker, 'w'):
+            pass
+        logger.info(f"Ensured data directories exist under: {data_dirs['data']}")
+    except OSError as e:
+        logger.warning(f"Error creating data directories: {e}")
     
     return data_dirs
 
-data_dirs = ensure_data_dirs()
-
-# Set environment variables to help the application find its data
-os.environ["GITHUB_ANALYZER_DATA_DIR"] = data_dirs["data"]
-os.environ["GITHUB_ANALYZER_MODE"] = MODE
+# Runtime mode, base directory and data directories, set by initialize_environment()
+MODE = None
+BASE_DIR = None
+data_dirs = None
 
-# Adjust Python path based on the detected mode
-if MODE == "bundle":
-    # For PyInstaller bundle
-    sys.path.insert(0, str(BASE_DIR))
-else:
-    # For development mode
-    src_dir = BASE_DIR / "src"
-    sys.path.insert(0, str(BASE_DIR))
-    if src_dir.exists():
-        sys.path.insert(0, str(src_dir))
+def _prepend_sys_path(path):
+    """Put path at the front of sys.path unless it is already on it"""
+    if path not in sys.path:
+        sys.path.insert(0, path)
 
-# Import the Flask app
-logger.info("Importing Flask app")
-try:
+def initialize_environment():
+    """Detect the run mode, create the data directories and set up the environment and import path"""
+    global MODE, BASE_DIR, data_dirs
+    if data_dirs is not None:
+        return
+    
+    app_info = get_application_mode()
+    MODE = app_info["mode"]
+    BASE_DIR = app_info["base_dir"]
+    data_dirs = ensure_data_dirs()
+    
+    # Set environment variables to help the application find its data
+    os.environ["GITHUB_ANALYZER_DATA_DIR"] = data_dirs["data"]
+    os.environ["GITHUB_ANALYZER_MODE"] = MODE
+    
+    # Adjust Python path based on the detected mode
     if MODE == "bundle":
-        try:
-            from main import app
-            logger.info("Imported main.app")
-        except ImportError as e:
-            logger.warning(f"Direct import failed: {e}")
-            # Fall back to the src prefix import
-            from src.main import app
-            logger.info("Imported src.main.app")
+        # For PyInstaller bundle
+        _prepend_sys_path(str(BASE_DIR))
     else:
-        # Development mode
-        from src.main import app
-    
-    # Import the config
+        # For development mode: BASE_DIR for "src.main", src for main's own
+        # top-level imports ("config", "github.repo", ...)
+        src_dir = BASE_DIR / "src"
+        _prepend_sys_path(str(BASE_DIR))
+        if os.path.isdir(src_dir):
+            _prepend_sys_path(str(src_dir))
+
+# Flask app and port, populated by import_flask_app() when the app is launched
+app = None
+PORT = 5000
+
+def import_flask_app():
+    """Import the Flask app and config, deferred so heavy ML modules load only on launch"""
+    global app, PORT
+    initialize_environment()
+    logger.info("Importing Flask app")
     try:
         if MODE == "bundle":
             try:
-                from config import Config
-            except ImportError:
-                from src.config import Config
+                from main import app
+                logger.info("Imported main.app")
+            except ImportError as e:
+                logger.warning(f"Direct import failed: {e}")
+                # Fall back to the src prefix import
+                from src.main import app
+                logger.info("Imported src.main.app")
         else:
-            from src.config import Config
-        
-        config = Config()
-        # Override config paths with our platform-specific paths
-        config.data_dir = Path(data_dirs["data"])
-        config.repos_dir = Path(data_dirs["repos"])
-        config.index_dir = Path(data_dirs["indexes"])
-        config.models_dir = Path(data_dirs["models"])
-        
-        # Update config with GPU information
-        config.gpu_available = has_gpu
-        if has_gpu and gpu_info:
-            config.gpu_info = gpu_info
+            # Development mode
+            from src.main import app
         
-        # Access the PORT or set default
-        PORT = getattr(config, 'PORT', 5000)
+        # Import the config
+        try:
+            if MODE == "bundle":
+                try:
+                    from config import Config
+                except ImportError:
+                    from src.config import Config
+            else:
+                from src.config import Config
+            
+            config = Config()
+            # Override config paths with our platform-specific paths
+            config.data_dir = Path(data_dirs["data"])
+            config.repos_dir = Path(data_dirs["repos"])
+            config.index_dir = Path(data_dirs["indexes"])
+            config.models_dir = Path(data_dirs["models"])
+            
+            # Access the configured PORT
+            PORT = config.PORT
+            
+        except ImportError as e:
+            logger.warning(f"Could not import Config: {e}")
+            PORT = 5000
         
+        logger.info(f"Using port {PORT}")
     except ImportError as e:
-        logger.warning(f"Could not import Config: {e}")
-        PORT = 5000
+        logger.error(f"Failed to import Flask app: {e}")
+        logger.error(traceback.format_exc())
+        _fatal(f"Failed to import Flask app: {e}")
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        logger.error(traceback.format_exc())
+        _fatal(f"Unexpected error: {e}")
     
-    logger.info(f"Using port {PORT}")
-except ImportError as e:
-    logger.error(f"Failed to import Flask app: {e}")
-    logger.error(traceback.format_exc())
-    input("Press Enter to exit...") # Allow user to see the error
-    sys.exit(1)
-except Exception as e:
-    logger.error(f"Unexpected error: {e}")
-    logger.error(traceback.format_exc())
-    input("Press Enter to exit...") # Allow user to see the error
-    sys.exit(1)
-
-# Configure the Flask app
-app.config['TEMPLATES_AUTO_RELOAD'] = False
-app.config['SERVER_NAME'] = None
+    return app
 
 # Server thread
 server_thread = None
 
-def run_flask():
-    """Run the Flask server in the current thread"""
-    logger.info(f"Starting Flask server on port {PORT}")
+# Waitress worker threads; long LLM requests hold a thread while the UI keeps
+# polling progress and loading static assets, so keep some headroom
+SERVER_THREADS = 8
+
+def create_flask_server():
+    """Create the waitress server for the Flask app; the socket is bound and listening on return"""
+    # Imported here so waitress is only loaded when the app is launched
+    from waitress import create_server
+    return create_server(app, host='127.0.0.1', port=PORT, threads=SERVER_THREADS,
+                         connection_limit=100, channel_timeout=60)
+
+def run_flask(server):
+    """Serve the Flask app in the current thread"""
     try:
-        app.run(host='127.0.0.1', port=PORT, debug=False, threaded=True)
+        server.run()
     except Exception as e:
         logger.error(f"Error running Flask server: {e}")
         logger.error(traceback.format_exc())
 
 def start_server_thread():
-    """Start Flask in a separate thread"""
+    """
+    Bind the server socket in the calling thread, then serve from a separate thread.
+    
+    The server accepts connections as soon as this returns, so no readiness
+    wait is needed; bind errors (e.g. port in use) are raised here.
+    """
     global server_thread
-    server_thread = threading.Thread(target=run_flask)
+    logger.info(f"Starting Flask server on port {PORT}")
+    server = create_flask_server()
+    server_thread = threading.Thread(target=run_flask, args=(server,))
     server_thread.daemon = True
     server_thread.start()
     logger.info("Flask server thread started")
@@ -279,34 +409,27 @@ def on_closed():
 
 def launch_app():
     """Launch the application"""
-    # Start the Flask server in a thread
-    start_server_thread()
+    # Logging, GPU probing and heavy imports are deferred until here so
+    # --create-installer and module import stay cheap
+    setup_logging()
+    import webview
     
-    # Wait for the server to start
-    logger.info("Waiting for Flask server to start...")
-    server_started = False
-    for i in range(30):  # Wait up to 15 seconds
-        try:
-            import requests
-            logger.info(f"Attempt {i+1}: Checking server status")
-            response = requests.get(f'http://127.0.0.1:{PORT}/api/system-status')
-            if response.status_code == 200:
-                logger.info("Flask server is running")
-                server_started = True
-                break
-            else:
-                logger.warning(f"Server returned status code: {response.status_code}")
-        except requests.exceptions.ConnectionError:
-            logger.info("Connection refused, server not ready yet")
-            time.sleep(0.5)
-        except Exception as e:
-            logger.error(f"Error checking server status: {e}")
-            time.sleep(0.5)
+    # Probe the GPU before the Flask app imports: the installer result is a
+    # small file read, and the torch fallback must not race main's imports of
+    # torch/transformers from another thread or its setting of
+    # GITHUB_ANALYZER_GPU_AVAILABLE against Config() reading it
+    has_gpu, gpu_info = check_gpu_availability()
     
-    if not server_started:
-        logger.error("Flask server didn't start in time")
-        input("Press Enter to exit...") # Allow user to see the error
-        sys.exit(1)
+    import_flask_app()
+    
+    # Start the Flask server in a thread; it is listening once this returns
+    try:
+        start_server_thread()
+    except Exception as e:
+        logger.error(f"Flask server failed to start: {e}")
+        logger.error(traceback.format_exc())
+        _fatal(f"Flask server failed to start: {e}")
+    logger.info("Flask server is running")
     
     # Create and start the webview
     logger.info("Creating webview window...")
@@ -329,49 +452,14 @@ def launch_app():
     webview.start(debug=False)  # Changed debug from True to False
     logger.info("Webview closed")
 
-def create_installer():
-    """
-    Create an installer for the application.
-    This function uses NSIS (Nullsoft Scriptable Install System) to create 
-    an installer for the application.
-    """
-    try:
-        # First, check if NSIS is installed
-        try:
-            subprocess.run(['makensis', '/VERSION'], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            logger.info("NSIS is installed, proceeding with installer creation")
-        except (subprocess.SubprocessError, FileNotFoundError):
-            logger.error("NSIS not found. Please install NSIS to create installers.")
-            return False
-            
-        # Create dist directory for PyInstaller output
-        dist_dir = os.path.join(os.getcwd(), "installer_dist")
-        os.makedirs(dist_dir, exist_ok=True)
-        
-        # Run PyInstaller to create distributable files
-        logger.info("Running PyInstaller to create distributable files...")
-        
-        # Note: We'll use the spec file that already exists
-        spec_file = os.path.join(os.getcwd(), "github_repo_analyzer.spec")
-        if not os.path.exists(spec_file):
-            logger.error(f"Spec file not found: {spec_file}")
-            return False
-            
-        pyinstaller_cmd = [
-            'pyinstaller',
-            spec_file,
-            '--distpath', dist_dir,
-            '--workpath', os.path.join(os.getcwd(), "installer_build"),
-            '--noconfirm'
-        ]
-        
-        subprocess.run(pyinstaller_cmd, check=True)
-        logger.info("PyInstaller completed successfully")
-        
-        # Create NSIS installer script
-        nsis_script = """
+# NSIS script used by create_installer(), dedented once at import
+_NSIS_TEMPLATE = textwrap.dedent("""
         !include "MUI2.nsh"
         
+        ; Solid LZMA compression with a larger dictionary
+        SetCompressor /SOLID lzma
+        SetCompressorDictSize 64
+        
         ; Define application name and installer filename
         Name "GitHub Repository Analyzer"
         OutFile "GitHubRepoAnalyzer_Setup.exe"
@@ -455,12 +543,55 @@ def create_installer():
             ; Remove registry keys
             DeleteRegKey HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\GitHubRepoAnalyzer"
         SectionEnd
-        """
+        """)
+
+def create_installer():
+    """
+    Create an installer for the application.
+    This function uses NSIS (Nullsoft Scriptable Install System) to create 
+    an installer for the application.
+    """
+    try:
+        # First, check if NSIS is installed
+        try:
+            subprocess.run(['makensis', '/VERSION'], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            logger.info("NSIS is installed, proceeding with installer creation")
+        except (subprocess.SubprocessError, FileNotFoundError):
+            logger.error("NSIS not found. Please install NSIS to create installers.")
+            return False
+            
+        # Create dist directory for PyInstaller output
+        dist_dir = os.path.join(os.getcwd(), "installer_dist")
+        os.makedirs(dist_dir, exist_ok=True)
+        
+        # Run PyInstaller to create distributable files
+        logger.info("Running PyInstaller to create distributable files...")
+        
+        # Note: We'll use the spec file that already exists
+        spec_file = os.path.join(os.getcwd(), "github_repo_analyzer.spec")
+        if not os.path.exists(spec_file):
+            logger.error(f"Spec file not found: {spec_file}")
+            return False
+            
+        pyinstaller_cmd = [
+            'pyinstaller',
+            spec_file,
+            '--distpath', dist_dir,
+            '--workpath', os.path.join(os.getcwd(), "installer_build"),
+            '--noconfirm'
+        ]
         
-        # Write NSIS script to a file
-        nsis_file = os.path.join(os.getcwd(), "installer.nsi")
-        with open(nsis_file, 'w') as f:
-            f.write(nsis_script)
+        # Write the NSIS script while PyInstaller runs; it doesn't depend on its output
+        pyinstaller_process = subprocess.Popen(pyinstaller_cmd)
+        try:
+            nsis_file = os.path.join(os.getcwd(), "installer.nsi")
+            with open(nsis_file, 'w') as f:
+                f.write(_NSIS_TEMPLATE)
+        finally:
+            returncode = pyinstaller_process.wait()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, pyinstaller_cmd)
+        logger.info("PyInstaller completed successfully")
         
         # Run NSIS to create the installer
         logger.info("Creating installer with NSIS...")
@@ -481,7 +612,11 @@ def create_installer():
         return False
 
 if __name__ == '__main__':
-    # Check for installer creation argument
+    # Worker processes (e.g. code element extraction) re-run the frozen executable
+    multiprocessing.freeze_support()
+    setup_logging()
+    
+    # Check for installer creation argument; it needs none of the launch-time setup
     if len(sys.argv) > 1 and sys.argv[1] == '--create-installer':
         print("Creating installer...")
         if create_installer():
@@ -497,6 +632,6 @@ if __name__ == '__main__':
         except Exception as e:
             logger.error(f"Unhandled exception: {e}")
             logger.error(traceback.format_exc())
-            input("Press Enter to exit...") # Allow user to see the error
+            _show_error(f"Unhandled exception: {e}")
         finally:
             logger.info("Application exiting")
\ No newline at end of file
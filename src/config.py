@@ -2,8 +2,15 @@
 Configuration settings for the GitHub Repository Analyzer.
 """
 import os
+import logging
 from pathlib import Path
 
+logger = logging.getLogger('github_repo_analyzer')
+
+# Project root and the default data location used when the launcher hasn't set one
+_CONFIG_BASE_DIR = Path(__file__).resolve().parent.parent
+_DEFAULT_DATA_DIR = _CONFIG_BASE_DIR / ".data"
+
 class Config:
     def __init__(self):
         # GPU configuration
@@ -15,16 +22,15 @@ class Config:
         env_data_dir = os.environ.get("GITHUB_ANALYZER_DATA_DIR")
         if env_data_dir:
             self.data_dir = Path(env_data_dir)
-            self.repos_dir = self.data_dir / "repos"
-            self.index_dir = self.data_dir / "indexes"
-            self.models_dir = self.data_dir / "models"
         else:
             # Fall back to relative paths if environment variable not set
-            self.base_dir = Path(os.path.dirname(os.path.abspath(__file__))).parent
-            self.data_dir = self.base_dir / ".data"
-            self.repos_dir = self.data_dir / "repos"
-            self.index_dir = self.data_dir / "indexes"
-            self.models_dir = self.data_dir / "models"
+            self.base_dir = _CONFIG_BASE_DIR
+            self.data_dir = _DEFAULT_DATA_DIR
+        self.repos_dir = self.data_dir / "repos"
+        self.index_dir = self.data_dir / "indexes"
+        self.models_dir = self.data_dir / "models"
+        # Cached code generation responses (created on first write)
+        self.responses_dir = self.data_dir / "cache" / "responses"
         
         # Model configuration
         self.model_name = "sentence-transformers/all-MiniLM-L6-v2"  # For embeddings
@@ -37,12 +43,12 @@ class Config:
         # Port configuration
         self.PORT = 5000
         
-        # Initialize directories
-        os.makedirs(self.data_dir, exist_ok=True)
-        os.makedirs(self.repos_dir, exist_ok=True)
-        os.makedirs(self.index_dir, exist_ok=True)
-        os.makedirs(self.models_dir, exist_ok=True)
+        # Initialize directories (the launcher already created them when it set the env var)
+        if not env_data_dir:
+            for dir_path in (self.data_dir, self.repos_dir, self.index_dir, self.models_dir):
+                if not os.path.isdir(dir_path):
+                    os.makedirs(dir_path, exist_ok=True)
         
-        # Log configuration at init
-        print(f"Data directory: {self.data_dir}")
-        print(f"GPU available: {self.gpu_available}")
\ No newline at end of file
+        # Log configuration at init (lazy formatting, skipped unless DEBUG is enabled)
+        logger.debug("Data directory: %s", self.data_dir)
+        logger.debug("GPU available: %s", self.gpu_available)
\ No newline at end of file
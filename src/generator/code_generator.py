@@ -3,50 +3,805 @@ Code generator module for generating tests and documentation.
 """
 import os
 import re
+import sys
+import io
 import ast
+import asyncio
+import time
+import string
+import inspect
+import hashlib
+import functools
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+try:
+    # RE2 matches in linear time, which matters when scanning large source files
+    import re2
+except ImportError:
+    import re as re2
+
+try:
+    # Native parsers for many languages; without it only Python and JS/TS are extracted
+    from tree_sitter_languages import get_parser as get_tree_sitter_parser
+except ImportError:
+    get_tree_sitter_parser = None
 
 logger = logging.getLogger('github_repo_analyzer')
 
+@dataclass(slots=True, frozen=True)
+class FuncInfo:
+    """A function or method extracted from source code"""
+    name: str
+    args: Tuple[str, ...] = ()
+    docstring: Optional[str] = None
+    line_start: Optional[int] = None
+    line_end: Optional[int] = None
+    is_async: bool = False
+
+@dataclass(slots=True, frozen=True)
+class ClassInfo:
+    """A class extracted from source code"""
+    name: str
+    docstring: Optional[str] = None
+    methods: Tuple[FuncInfo, ...] = ()
+    line_start: Optional[int] = None
+    line_end: Optional[int] = None
+    extends: Optional[str] = None
+
+# File extension -> language name
+_LANGUAGE_MAP: Mapping[str, str] = MappingProxyType({
+    sys.intern(ext): sys.intern(language) for ext, language in {
+        '.py': 'python',
+        '.js': 'javascript',
+        '.jsx': 'javascript',
+        '.ts': 'typescript',
+        '.tsx': 'typescript',
+        '.java': 'java',
+        '.c': 'c',
+        '.cpp': 'cpp',
+        '.h': 'cpp',
+        '.hpp': 'cpp',
+        '.cs': 'csharp',
+        '.go': 'go',
+        '.rb': 'ruby',
+        '.php': 'php',
+        '.swift': 'swift',
+        '.kt': 'kotlin',
+        '.rs': 'rust',
+        '.html': 'html',
+        '.css': 'css',
+        '.scss': 'scss',
+        '.md': 'markdown',
+        '.json': 'json',
+        '.yml': 'yaml',
+        '.yaml': 'yaml',
+        '.xml': 'xml',
+        '.sh': 'bash',
+        '.bat': 'batch'
+    }.items()
+})
+
+# Tree-sitter node types holding (functions, classes) for each language
+_TREE_SITTER_NODE_TYPES: Mapping[str, Tuple[frozenset, frozenset]] = MappingProxyType({
+    'python': (frozenset({'function_definition'}), frozenset({'class_definition'})),
+    'javascript': (
+        frozenset({'function_declaration', 'generator_function_declaration', 'method_definition'}),
+        frozenset({'class_declaration'})
+    ),
+    'typescript': (
+        frozenset({'function_declaration', 'generator_function_declaration', 'method_definition'}),
+        frozenset({'class_declaration', 'abstract_class_declaration', 'interface_declaration'})
+    ),
+    'java': (
+        frozenset({'method_declaration', 'constructor_declaration'}),
+        frozenset({'class_declaration', 'interface_declaration', 'enum_declaration'})
+    ),
+    'go': (frozenset({'function_declaration', 'method_declaration'}), frozenset({'type_spec'})),
+    'rust': (frozenset({'function_item'}), frozenset({'struct_item', 'enum_item', 'trait_item'})),
+    'c': (frozenset({'function_definition'}), frozenset({'struct_specifier'})),
+    'cpp': (frozenset({'function_definition'}), frozenset({'class_specifier', 'struct_specifier'})),
+    'csharp': (
+        frozenset({'method_declaration', 'constructor_declaration'}),
+        frozenset({'class_declaration', 'interface_declaration', 'struct_declaration'})
+    ),
+    'ruby': (frozenset({'method', 'singleton_method'}), frozenset({'class', 'module'})),
+    'php': (
+        frozenset({'function_definition', 'method_declaration'}),
+        frozenset({'class_declaration', 'interface_declaration', 'trait_declaration'})
+    ),
+})
+
+# Language names that differ in tree_sitter_languages
+_TREE_SITTER_LANGUAGE_NAMES = {'csharp': 'c_sharp'}
+
+# Tree-sitter parsers by language, created on first use (None when unavailable)
+_tree_sitter_parsers = {}
+
+# Generations run at once by generate_for_files(). The bundled model evaluates one
+# prompt at a time, so raise this only for backends that serve concurrent requests.
+MAX_CONCURRENT_GENERATIONS = 1
+
+# Files longer than this are trimmed to their function and class definitions before being
+# sent to the LLM, so large files fit within the LLM's prompt context budget instead of
+# being cut off at the end. The 4096-token window less the answer's 2048 leaves about
+# 5,700 characters of prompt; this leaves the rest for the instructions and element summaries.
+MAX_CODE_CHARS = 3584
+
+# Number of LLM responses kept in memory, and how long responses stay valid on disk
+_RESPONSE_CACHE_SIZE = 128
+RESPONSE_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Tasks whose responses depend on the file's path as well as its content: generated tests
+# import the module by its path, so they can't be shared between identical files
+_PATH_KEYED_TASKS = frozenset({"tests"})
+
+# Part of every response cache key. Bump it whenever the prompt templates below change,
+# so responses generated from older prompts aren't served again.
+PROMPT_VERSION = 1
+
+# Number of files whose extracted functions and classes are kept in memory
+_ELEMENTS_CACHE_SIZE = 256
+
+# JS/TS declarations, matched in a single pass: function declarations, arrow functions
+# assigned to a const, and classes. None of these need backtracking, so they run on RE2.
+_JS_ELEMENT_RE = re2.compile(
+    r'(?P<func>(?P<func_async>async\s+)?function\s+(?P<func_name>\w+)\s*\((?P<func_args>[^)]*)\))'
+    r'|(?P<arrow>const\s+(?P<arrow_name>\w+)\s*=\s*(?P<arrow_async>async\s+)?\((?P<arrow_args>[^)]*)\)\s*=>)'
+    r'|(?P<cls>class\s+(?P<cls_name>\w+)(?:\s+extends\s+(?P<cls_extends>\w+))?\s*\{)'
+)
+
+# Runs of three or more backticks, which would end a Markdown code fence
+_BACKTICK_RUN_RE = re.compile(r'`{3,}')
+
+# The code is passed to the LLM as a context item, which is rendered ahead of the
+# instructions below. Every task on the same file therefore shares the prompt prefix
+# up to the end of the code, and the model can reuse it instead of re-evaluating it.
+# The instructions are static and the per-file details come last.
+_TEST_PREAMBLE = """You are a test-driven development expert. Your task is to create comprehensive tests for the code above.
+
+Generate test code that covers:
+1. All public functions and methods with multiple test cases
+2. Edge cases and error handling
+3. Different input scenarios
+4. Appropriate mocking of dependencies when necessary
+
+Make the tests specific to this code, with actual function names and realistic inputs and expected outputs.
+Include setup and teardown as appropriate. Structure the tests logically with clear descriptions.
+
+"""
+
+_DOC_PREAMBLE = """You are a documentation expert. Your task is to create comprehensive documentation for the code above.
+
+Generate detailed documentation for this code, including:
+
+1. A file-level overview explaining the purpose and functionality
+2. Documentation for each function and class, with:
+- Description of purpose
+- Parameters and return values with types
+- Examples of usage where helpful
+- Any exceptions or errors that might be thrown
+
+Create the documentation in a format that could be directly inserted into the original code.
+Be specific to this code, with accurate function names, parameter names, and descriptions.
+
+"""
+
+_EXPLANATION_PREAMBLE = """You are a programming expert who explains code in clear, concise terms.
+Explain the code above.
+
+Provide a detailed explanation of:
+1. What this code does
+2. Its main components and how they interact
+3. The purpose and functionality of key functions and classes
+4. Any notable patterns or techniques used
+5. Potential issues or improvements
+
+"""
+
+# Test framework recommendations by language
+_TEST_FRAMEWORK: Mapping[str, str] = MappingProxyType({
+    'python': 'pytest or unittest',
+    'javascript': 'Jest or Mocha',
+    'typescript': 'Jest or Jasmine',
+    'java': 'JUnit',
+    'cpp': 'Google Test (gtest) or Catch2',
+    'csharp': 'xUnit or NUnit',
+    'go': 'testing package',
+    'ruby': 'RSpec or Minitest',
+    'php': 'PHPUnit',
+    'rust': 'the built-in testing framework'
+})
+
+# Documentation formats by language
+_DOC_FORMAT: Mapping[str, str] = MappingProxyType({
+    'python': 'Google style or NumPy style docstrings',
+    'javascript': 'JSDoc',
+    'typescript': 'TSDoc or JSDoc',
+    'java': 'Javadoc',
+    'cpp': 'Doxygen',
+    'csharp': 'XML documentation comments',
+    'go': 'godoc style comments',
+    'ruby': 'YARD',
+    'php': 'PHPDoc',
+    'rust': 'rustdoc'
+})
+
+# Full prompts: static preamble followed by the per-file details
+_ELEMENTS_TAIL = """File: $file_path
+Language: $language
+
+Functions in this code:
+$function_summary
+
+Classes in this code:
+$class_summary
+
+"""
+
+_TEST_PROMPT = string.Template(_TEST_PREAMBLE + _ELEMENTS_TAIL + """Use $test_framework.
+
+""")
+
+_DOC_PROMPT = string.Template(_DOC_PREAMBLE + """File: $file_path
+Language: $language
+
+Write the documentation in $doc_format format.
+
+""")
+
+_EXPLANATION_PROMPT = string.Template(_EXPLANATION_PREAMBLE + """File: $file_path
+Language: $language
+
+""")
+
+def extract_code_elements(code_content: str, language: str) -> Tuple[List[FuncInfo], List[ClassInfo]]:
+    """
+    Parse functions and classes out of code content.
+    
+    Uses tree-sitter when it is installed and supports the language, and
+    falls back to Python's ast module and regexes for JS/TS otherwise.
+    This is a module-level function so it can be run in worker processes.
+    
+    Args:
+        code_content: Content of the code file
+        language: Programming language of the code
+        
+    Returns:
+        Tuple of (functions, classes)
+    """
+    functions = []
+    classes = []
+    
+    parser = _get_tree_sitter_parser(language)
+    if parser is not None:
+        try:
+            return _extract_with_tree_sitter(parser, code_content, language)
+        except Exception as e:
+            logger.warning(f"Tree-sitter extraction failed, falling back: {e}")
+    
+    try:
+        if language == 'python':
+            # Parse Python code with AST; only top-level definitions and class methods are needed
+            tree = ast.parse(code_content)
+            
+            for node in tree.body:
+                if isinstance(node, ast.FunctionDef):
+                    functions.append(_python_func_info(node))
+                
+                elif isinstance(node, ast.ClassDef):
+                    classes.append(ClassInfo(
+                        name=node.name,
+                        docstring=ast.get_docstring(node),
+                        methods=tuple(
+                            _python_func_info(child)
+                            for child in node.body
+                            if isinstance(child, ast.FunctionDef)
+                        ),
+                        line_start=node.lineno,
+                        line_end=node.end_lineno or node.lineno
+                    ))
+        
+        elif language in ['javascript', 'typescript']:
+            # Simple regex-based extraction for JS/TS
+            # This is a simplified approach; a proper parser would be better
+            for match in _JS_ELEMENT_RE.finditer(code_content):
+                if match.group('cls'):
+                    classes.append(ClassInfo(
+                        name=match.group('cls_name'),
+                        extends=match.group('cls_extends')
+                    ))
+                else:
+                    kind = 'func' if match.group('func') else 'arrow'
+                    functions.append(FuncInfo(
+                        name=match.group(f'{kind}_name'),
+                        args=tuple(arg.strip() for arg in match.group(f'{kind}_args').split(',') if arg.strip()),
+                        is_async=match.group(f'{kind}_async') is not None
+                    ))
+    
+    except Exception as e:
+        logger.error(f"Error extracting code elements: {e}")
+    
+    return functions, classes
+
+def _python_func_info(node: ast.FunctionDef) -> FuncInfo:
+    """Build a FuncInfo from a Python function definition node"""
+    return FuncInfo(
+        name=node.name,
+        args=tuple(arg.arg for arg in node.args.args),
+        docstring=ast.get_docstring(node),
+        line_start=node.lineno,
+        line_end=node.end_lineno or node.lineno
+    )
+
+def _get_tree_sitter_parser(language: str):
+    """Return a cached tree-sitter parser for the language, or None if it can't be used"""
+    if get_tree_sitter_parser is None or language not in _TREE_SITTER_NODE_TYPES:
+        return None
+    
+    if language not in _tree_sitter_parsers:
+        try:
+            _tree_sitter_parsers[language] = get_tree_sitter_parser(
+                _TREE_SITTER_LANGUAGE_NAMES.get(language, language)
+            )
+        except Exception as e:
+            logger.warning(f"Tree-sitter parser unavailable for {language}: {e}")
+            _tree_sitter_parsers[language] = None
+    
+    return _tree_sitter_parsers[language]
+
+def _extract_with_tree_sitter(parser, code_content: str, language: str) -> Tuple[List[FuncInfo], List[ClassInfo]]:
+    """
+    Extract top-level functions and classes (with their methods) from a tree-sitter parse.
+    
+    Args:
+        parser: Tree-sitter parser for the language
+        code_content: Content of the code file
+        language: Programming language of the code
+        
+    Returns:
+        Tuple of (functions, classes)
+    """
+    function_types, class_types = _TREE_SITTER_NODE_TYPES[language]
+    source = code_content.encode('utf-8')
+    tree = parser.parse(source)
+    
+    functions = []
+    classes = []
+    
+    def text(node) -> str:
+        return source[node.start_byte:node.end_byte].decode('utf-8', errors='replace')
+    
+    def collect_functions(node, into: List[FuncInfo]):
+        # Gather function nodes below node without descending into them (or into nested classes)
+        stack = list(reversed(node.children))
+        while stack:
+            child = stack.pop()
+            if child.type in function_types:
+                into.append(_tree_sitter_func_info(child, text))
+            elif _is_js_function_variable(child):
+                into.append(_tree_sitter_func_info(child.child_by_field_name('value'), text, child))
+            elif child.type not in class_types:
+                stack.extend(reversed(child.children))
+    
+    stack = list(reversed(tree.root_node.children))
+    while stack:
+        node = stack.pop()
+        if node.type in class_types:
+            methods = []
+            body = node.child_by_field_name('body')
+            if body is not None:
+                collect_functions(body, methods)
+            classes.append(ClassInfo(
+                name=_tree_sitter_name(node, text) or '<anonymous>',
+                docstring=_tree_sitter_docstring(node, text) if language == 'python' else None,
+                methods=tuple(methods),
+                line_start=node.start_point[0] + 1,
+                line_end=node.end_point[0] + 1,
+                extends=_tree_sitter_extends(node, text) if language in ('javascript', 'typescript') else None
+            ))
+        elif node.type in function_types:
+            functions.append(_tree_sitter_func_info(node, text, docstring=language == 'python'))
+        elif _is_js_function_variable(node):
+            functions.append(_tree_sitter_func_info(node.child_by_field_name('value'), text, node))
+        else:
+            stack.extend(reversed(node.children))
+    
+    return functions, classes
+
+def _is_js_function_variable(node) -> bool:
+    """Whether node is a JS/TS variable declarator assigned an arrow or function expression"""
+    if node.type != 'variable_declarator':
+        return False
+    value = node.child_by_field_name('value')
+    return value is not None and value.type in ('arrow_function', 'function', 'function_expression')
+
+def _tree_sitter_name(node, text) -> Optional[str]:
+    """Name of a definition node, following C/C++ declarators when there is no name field"""
+    name = node.child_by_field_name('name')
+    if name is not None:
+        return text(name)
+    
+    declarator = node.child_by_field_name('declarator')
+    while declarator is not None:
+        if declarator.type in ('identifier', 'field_identifier', 'qualified_identifier',
+                               'destructor_name', 'operator_name', 'type_identifier'):
+            return text(declarator)
+        declarator = declarator.child_by_field_name('declarator')
+    return None
+
+def _tree_sitter_func_info(node, text, name_node=None, docstring: bool = False) -> FuncInfo:
+    """Build a FuncInfo from a tree-sitter function node"""
+    parameters = node.child_by_field_name('parameters') or node.child_by_field_name('parameter')
+    declarator = node.child_by_field_name('declarator')
+    while parameters is None and declarator is not None:
+        parameters = declarator.child_by_field_name('parameters')
+        declarator = declarator.child_by_field_name('declarator')
+    
+    args = ()
+    if parameters is not None:
+        if parameters.type == 'identifier':
+            args = (text(parameters),)
+        else:
+            args = tuple(
+                _tree_sitter_param_name(param, text)
+                for param in parameters.named_children
+                if param.type != 'comment'
+            )
+    
+    return FuncInfo(
+        name=_tree_sitter_name(name_node or node, text) or '<anonymous>',
+        args=args,
+        docstring=_tree_sitter_docstring(node, text) if docstring else None,
+        line_start=node.start_point[0] + 1,
+        line_end=node.end_point[0] + 1,
+        is_async=any(child.type == 'async' for child in node.children)
+    )
+
+def _tree_sitter_param_name(param, text) -> str:
+    """Name of a parameter node, or its source text when it has no single name"""
+    if param.type == 'identifier':
+        return text(param)
+    for field in ('name', 'pattern', 'declarator'):
+        name = param.child_by_field_name(field)
+        if name is not None and name.type == 'identifier':
+            return text(name)
+    for child in param.named_children:
+        if child.type == 'identifier':
+            return text(child)
+    return text(param)
+
+def _tree_sitter_docstring(node, text) -> Optional[str]:
+    """Docstring of a Python function or class node"""
+    body = node.child_by_field_name('body')
+    if body is None or not body.named_children:
+        return None
+    first = body.named_children[0]
+    if first.type != 'expression_statement' or not first.named_children or first.named_children[0].type != 'string':
+        return None
+    try:
+        value = ast.literal_eval(text(first.named_children[0]))
+    except (ValueError, SyntaxError):
+        return None
+    return inspect.cleandoc(value) if isinstance(value, str) else None
+
+def _tree_sitter_extends(node, text) -> Optional[str]:
+    """Superclass of a JS/TS class declaration"""
+    for child in node.named_children:
+        if child.type != 'class_heritage':
+            continue
+        for clause in child.named_children:
+            if clause.type == 'extends_clause':
+                value = clause.child_by_field_name('value') or (clause.named_children[0] if clause.named_children else None)
+                return text(value) if value is not None else None
+            return text(clause)
+    return None
+
 class CodeGenerator:
-    def __init__(self, llm_generator):
+    def __init__(self, llm_generator, cache_dir: Optional[str] = None):
         """
         Initialize the code generator.
         
         Args:
             llm_generator: LLM generator for text generation
+            cache_dir: Directory for persisting LLM responses across runs (memory only if None)
         """
         self.llm_generator = llm_generator
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        # Content-addressed key -> LLM response
+        self._responses = OrderedDict()
+        # Whether expired responses have been removed from cache_dir yet
+        self._pruned_response_cache = False
+        # (language, content hash) -> (functions, classes)
+        self._elements_cache = OrderedDict()
     
-    def generate_tests(self, code_content: str, file_path: str, language: str = None) -> str:
+    async def agenerate_tests(self, code_content: str, file_path: str, language: str = None) -> str:
+        """Async variant of generate_tests, run in a worker thread"""
+        return await asyncio.to_thread(self.generate_tests, code_content, file_path, language)
+    
+    async def agenerate_documentation(self, code_content: str, file_path: str, language: str = None) -> str:
+        """Async variant of generate_documentation, run in a worker thread"""
+        return await asyncio.to_thread(self.generate_documentation, code_content, file_path, language)
+    
+    async def agenerate_code_explanation(self, code_content: str, file_path: str, language: str = None) -> str:
+        """Async variant of generate_code_explanation, run in a worker thread"""
+        return await asyncio.to_thread(self.generate_code_explanation, code_content, file_path, language)
+    
+    def generate_for_files(
+        self, 
+        files: Dict[str, str], 
+        max_concurrency: int = MAX_CONCURRENT_GENERATIONS
+    ) -> Dict[str, Dict[str, str]]:
         """
-        Generate test code for the given file.
+        Generate tests, documentation and an explanation for several files.
+        
+        Args:
+            files: Mapping of file path to file content
+            max_concurrency: Maximum number of generations in flight at once
+            
+        Returns:
+            Mapping of file path to a dictionary with "tests", "documentation" and
+            "explanation" keys
+        """
+        async def run(extract_pool: ProcessPoolExecutor) -> List[Dict[str, str]]:
+            loop = asyncio.get_running_loop()
+            semaphore = asyncio.Semaphore(max_concurrency)
+            
+            async def generate(file_path: str, code_content: str) -> Dict[str, str]:
+                # Parse in a worker process while earlier files are still being generated,
+                # then seed the cache so the generate_* methods don't parse again
+                language = self._detect_language(file_path)
+                key = self._elements_key(code_content, language)
+                if key not in self._elements_cache:
+                    elements = await loop.run_in_executor(extract_pool, extract_code_elements, code_content, language)
+                    self._remember_code_elements(key, elements)
+                
+                # One file's tasks run back to back, so each reuses the code prefix of the last prompt
+                async with semaphore:
+                    return {
+                        "tests": await self.agenerate_tests(code_content, file_path, language),
+                        "documentation": await self.agenerate_documentation(code_content, file_path, language),
+                        "explanation": await self.agenerate_code_explanation(code_content, file_path, language)
+                    }
+            
+            return await asyncio.gather(*(generate(path, content) for path, content in files.items()))
+        
+        if not files:
+            return {}
+        
+        with ProcessPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1)) as extract_pool:
+            return dict(zip(files, asyncio.run(run(extract_pool))))
+    
+    def _code_context(self, code_content: str, file_path: str, language: str) -> List[Dict[str, Any]]:
+        """Wrap the code as a single LLM context item, kept separate from the instructions"""
+        content = code_content
+        if len(code_content) > MAX_CODE_CHARS:
+            functions, classes = self._extract_code_elements(code_content, language)
+            content = self._slice_relevant(code_content, functions, classes)
+        
+        # Fence the code with a backtick run longer than any inside it, so code that
+        # contains ``` (e.g. Markdown) can't close the block early. The fence only
+        # depends on the content, which keeps the prompt prefix stable between calls.
+        fence = '`' * max(3, max(map(len, _BACKTICK_RUN_RE.findall(content)), default=0) + 1)
+        
+        return [{
+            'path': file_path,
+            'start_line': 1,
+            'end_line': code_content.count('\n') + 1,
+            'content': "".join((fence, language, "\n", content, "\n", fence))
+        }]
+    
+    def _slice_relevant(
+        self, 
+        code_content: str, 
+        functions: List[FuncInfo], 
+        classes: List[ClassInfo], 
+        max_chars: int = MAX_CODE_CHARS
+    ) -> str:
+        """
+        Trim code to the lines spanned by its functions and classes.
+        
+        Overlapping spans are merged and gaps are replaced with an elision marker,
+        except blank gaps, which become a single blank line, and gaps shorter than
+        their marker, which are kept. Spans are added in file order until max_chars
+        is reached; when no spans are known, the start of the file is kept instead.
         
         Args:
             code_content: Content of the code file
-            file_path: Path to the code file
+            functions: List of functions in the code
+            classes: List of classes in the code
+            max_chars: Maximum length of the result, including elision markers
+            
+        Returns:
+            The trimmed code, or code_content unchanged if it is within max_chars
+        """
+        if len(code_content) <= max_chars:
+            return code_content
+        
+        lines = code_content.splitlines()
+        spans = sorted(
+            (element.line_start, element.line_end)
+            for element in (*functions, *classes)
+            if element.line_start is not None and element.line_end is not None
+        )
+        if not spans:
+            spans = [(1, len(lines))]
+        
+        merged = []
+        for start, end in spans:
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        
+        def gap_parts(first: int, last: int) -> List[str]:
+            """Lines standing in for the skipped lines first..last (1-based, inclusive)"""
+            gap = lines[first - 1:last]
+            if not any(line.strip() for line in gap):
+                return [""]
+            marker = f"... ({len(gap)} lines elided) ..."
+            if sum(len(line) + 1 for line in gap) <= len(marker) + 1:
+                return gap
+            return [marker]
+        
+        parts = []
+        # Every part costs its length plus a newline. Room for the trailing marker is
+        # set aside up front, so the result never exceeds max_chars.
+        budget = max_chars - len(f"... ({len(lines)} lines elided) ...") - 1
+        next_line = 1
+        for start, end in merged:
+            first_cost = len(lines[start - 1]) + 1
+            if start > next_line:
+                filler = gap_parts(next_line, start - 1)
+                filler_cost = sum(len(part) + 1 for part in filler)
+                if filler_cost + first_cost > budget:
+                    break
+                parts.extend(filler)
+                budget -= filler_cost
+            elif first_cost > budget:
+                break
+            
+            line_no = start
+            while line_no <= end and len(lines[line_no - 1]) + 1 <= budget:
+                parts.append(lines[line_no - 1])
+                budget -= len(lines[line_no - 1]) + 1
+                line_no += 1
+            
+            next_line = line_no
+            if line_no <= end:
+                break
+        
+        if not parts:
+            # Not even one whole line fits (e.g. minified code); cut mid-line instead
+            return code_content[:max_chars]
+        
+        if next_line <= len(lines):
+            filler = gap_parts(next_line, len(lines))
+            if filler != [""]:
+                parts.extend(filler)
+        
+        return "\n".join(parts)
+    
+    def _response_key(self, task: str, language: str, code_content: str, file_path: str) -> str:
+        """
+        Content-addressed key for an LLM response.
+        
+        Documentation and explanations are shared by identical files anywhere in a repo;
+        tests are keyed on the file path too.
+        
+        Args:
+            task: "tests", "documentation" or "explanation"
             language: Programming language of the code
+            code_content: Content of the code file
+            file_path: Path to the code file
             
         Returns:
-            Generated test code
+            Hex digest to use as the cache key
+        """
+        # Responses depend on the model and backend as well as the prompt
+        model_name = getattr(self.llm_generator, 'model_name', '')
+        backend = "llama_cpp" if getattr(self.llm_generator, 'use_llama_cpp', False) else "transformers"
+        path = file_path.replace('\\', '/') if task in _PATH_KEYED_TASKS else ""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{PROMPT_VERSION}:{model_name}:{backend}:{task}:{language}:{path}:".encode('utf-8'))
+        digest.update(code_content.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _cached_response(self, key: str) -> Optional[str]:
         """
-        logger.info(f"Generating tests for {file_path}")
+        Look up a response in memory, then on disk.
         
-        # Determine language if not provided
-        if not language:
-            language = self._detect_language(file_path)
+        Args:
+            key: Key from _response_key
+            
+        Returns:
+            The cached response, or None if there is no fresh entry
+        """
+        response = self._responses.get(key)
+        if response is not None or self.cache_dir is None:
+            return response
+        
+        path = self.cache_dir / f"{key}.txt"
+        try:
+            if time.time() - path.stat().st_mtime > RESPONSE_CACHE_TTL:
+                path.unlink()
+                return None
+            response = path.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Error reading cached response {path}: {e}")
+            return None
         
-        # Extract functions and classes for targeted test generation
-        functions, classes = self._extract_code_elements(code_content, language)
+        self._remember_response(key, response)
+        return response
+    
+    def _store_response(self, key: str, response: str):
+        """Cache a non-empty response in memory and, if configured, on disk"""
+        if not response:
+            return
+        
+        self._remember_response(key, response)
+        if self.cache_dir is None:
+            return
         
-        # Create prompt for test generation
-        prompt = self._create_test_prompt(code_content, file_path, language, functions, classes)
+        if not self._pruned_response_cache:
+            self._pruned_response_cache = True
+            self._prune_response_cache()
+        
+        path = self.cache_dir / f"{key}.txt"
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_text(response, encoding='utf-8')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Error caching response to {path}: {e}")
+    
+    def _prune_response_cache(self):
+        """Delete responses older than RESPONSE_CACHE_TTL from cache_dir, so it doesn't grow forever"""
+        cutoff = time.time() - RESPONSE_CACHE_TTL
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"Error listing cached responses in {self.cache_dir}: {e}")
+            return
         
-        # Generate tests using LLM
-        tests = self.llm_generator.generate(prompt, [])
+        for entry in entries:
+            if not entry.name.endswith('.txt'):
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+            except OSError as e:
+                logger.warning(f"Error removing expired response {entry.path}: {e}")
+    
+    def _remember_response(self, key: str, response: str):
+        """Store a response in memory, evicting the oldest entry when full"""
+        self._responses[key] = response
+        if len(self._responses) > _RESPONSE_CACHE_SIZE:
+            self._responses.popitem(last=False)
+    
+    def generate_tests(self, code_content: str, file_path: str, language: str = None) -> str:
+        """
+        Generate test code for the given file.
         
-        return tests
+        Args:
+            code_content: Content of the code file
+            file_path: Path to the code file
+            language: Programming language of the code
+            
+        Returns:
+            Generated test code
+        """
+        return self._generate_task("tests", code_content, file_path, language)
     
     def generate_documentation(self, code_content: str, file_path: str, language: str = None) -> str:
         """
@@ -60,68 +815,143 @@ class CodeGenerator:
         Returns:
             Generated documentation
         """
-        logger.info(f"Generating documentation for {file_path}")
+        return self._generate_task("documentation", code_content, file_path, language)
+    
+    def generate_code_explanation(self, code_content: str, file_path: str, language: str = None) -> str:
+        """
+        Generate an explanation of the code.
+        
+        Args:
+            code_content: Content of the code file
+            file_path: Path to the code file
+            language: Programming language of the code
+            
+        Returns:
+            Generated explanation
+        """
+        return self._generate_task("explanation", code_content, file_path, language)
+    
+    def _generate_task(self, task: str, code_content: str, file_path: str, language: Optional[str]) -> str:
+        """
+        Generate the output for a task, reusing earlier results for the same content.
         
+        Args:
+            task: "tests", "documentation" or "explanation"
+            code_content: Content of the code file
+            file_path: Path to the code file
+            language: Programming language of the code
+            
+        Returns:
+            Generated text
+        """
         # Determine language if not provided
         if not language:
             language = self._detect_language(file_path)
         
-        # Extract functions and classes for targeted documentation generation
-        functions, classes = self._extract_code_elements(code_content, language)
+        response_key = self._response_key(task, language, code_content, file_path)
+        cached = self._cached_response(response_key)
+        if cached is not None:
+            logger.info(f"Using cached {task} for {file_path}")
+            return cached
         
-        # Create prompt for documentation generation
-        prompt = self._create_documentation_prompt(code_content, file_path, language, functions, classes)
+        logger.info(f"Generating {task} for {file_path}")
+        prompt, context = self._prepare_request(task, code_content, file_path, language)
+        response = self.llm_generator.generate(prompt, context)
+        self._store_response(response_key, response)
+        return response
+    
+    def generate_tests_stream(self, code_content: str, file_path: str, language: str = None) -> Iterator[str]:
+        """Streaming variant of generate_tests, yielding text chunks as they are generated"""
+        return self._stream_task("tests", code_content, file_path, language)
+    
+    def generate_documentation_stream(self, code_content: str, file_path: str, language: str = None) -> Iterator[str]:
+        """Streaming variant of generate_documentation, yielding text chunks as they are generated"""
+        return self._stream_task("documentation", code_content, file_path, language)
+    
+    def generate_code_explanation_stream(self, code_content: str, file_path: str, language: str = None) -> Iterator[str]:
+        """Streaming variant of generate_code_explanation, yielding text chunks as they are generated"""
+        return self._stream_task("explanation", code_content, file_path, language)
+    
+    def _stream_task(self, task: str, code_content: str, file_path: str, language: Optional[str]) -> Iterator[str]:
+        """
+        Stream the LLM output for a task.
         
-        # Generate documentation using LLM
-        documentation = self.llm_generator.generate(prompt, [])
+        Falls back to yielding the complete response in one chunk when the LLM
+        generator has no stream() method.
         
-        return documentation
+        Args:
+            task: "tests", "documentation" or "explanation"
+            code_content: Content of the code file
+            file_path: Path to the code file
+            language: Programming language of the code
+            
+        Yields:
+            Chunks of generated text
+        """
+        # Determine language if not provided
+        if not language:
+            language = self._detect_language(file_path)
+        
+        response_key = self._response_key(task, language, code_content, file_path)
+        cached = self._cached_response(response_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        logger.info(f"Streaming {task} for {file_path}")
+        prompt, context = self._prepare_request(task, code_content, file_path, language)
+        
+        stream = getattr(self.llm_generator, 'stream', None)
+        if stream is None:
+            response = self.llm_generator.generate(prompt, context)
+            yield response
+        else:
+            chunks = []
+            for chunk in stream(prompt, context):
+                chunks.append(chunk)
+                yield chunk
+            response = "".join(chunks)
+        
+        self._store_response(response_key, response)
     
-    def generate_code_explanation(self, code_content: str, file_path: str, language: str = None) -> str:
+    def _prepare_request(
+        self, 
+        task: str, 
+        code_content: str, 
+        file_path: str, 
+        language: Optional[str]
+    ) -> Tuple[str, List[Dict[str, Any]]]:
         """
-        Generate an explanation of the code.
+        Build the prompt and context for a single generation task.
         
         Args:
+            task: "tests", "documentation" or "explanation"
             code_content: Content of the code file
             file_path: Path to the code file
-            language: Programming language of the code
+            language: Programming language of the code, detected from the path if not given
             
         Returns:
-            Generated explanation
+            Tuple of (prompt, context) for the LLM generator
         """
-        logger.info(f"Generating explanation for {file_path}")
-        
         # Determine language if not provided
         if not language:
             language = self._detect_language(file_path)
         
-        # Create prompt for explanation generation
-        prompt = f"""You are a programming expert who explains code in clear, concise terms.
-                    Please explain the following code file:
-
-                    File: {file_path}
-                    Language: {language}
-
-                    ```{language}
-                    {code_content}
-                    ```
-
-                    Provide a detailed explanation of:
-                    1. What this code does
-                    2. Its main components and how they interact
-                    3. The purpose and functionality of key functions and classes
-                    4. Any notable patterns or techniques used
-                    5. Potential issues or improvements
-
-                    Explanation:
-                    """
-        
-        # Generate explanation using LLM
-        explanation = self.llm_generator.generate(prompt, [])
+        if task == "explanation":
+            prompt = _EXPLANATION_PROMPT.substitute(file_path=file_path, language=language)
+        else:
+            # Extract functions and classes for targeted generation
+            functions, classes = self._extract_code_elements(code_content, language)
+            if task == "tests":
+                prompt = self._create_test_prompt(file_path, language, functions, classes)
+            else:
+                prompt = self._create_documentation_prompt(file_path, language, functions, classes)
         
-        return explanation
+        return prompt, self._code_context(code_content, file_path, language)
     
-    def _detect_language(self, file_path: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _detect_language(file_path: str) -> str:
         """
         Detect the programming language based on file extension.
         
@@ -131,44 +961,15 @@ class CodeGenerator:
         Returns:
             Programming language name
         """
-        ext = os.path.splitext(file_path)[1].lower()
-        
-        language_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.jsx': 'javascript',
-            '.ts': 'typescript',
-            '.tsx': 'typescript',
-            '.java': 'java',
-            '.c': 'c',
-            '.cpp': 'cpp',
-            '.h': 'cpp',
-            '.hpp': 'cpp',
-            '.cs': 'csharp',
-            '.go': 'go',
-            '.rb': 'ruby',
-            '.php': 'php',
-            '.swift': 'swift',
-            '.kt': 'kotlin',
-            '.rs': 'rust',
-            '.html': 'html',
-            '.css': 'css',
-            '.scss': 'scss',
-            '.md': 'markdown',
-            '.json': 'json',
-            '.yml': 'yaml',
-            '.yaml': 'yaml',
-            '.xml': 'xml',
-            '.sh': 'bash',
-            '.bat': 'batch'
-        }
-        
-        return language_map.get(ext, 'text')
-    
-    def _extract_code_elements(self, code_content: str, language: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        return _LANGUAGE_MAP.get(os.path.splitext(file_path)[1].lower(), 'text')
+    
+    def _extract_code_elements(self, code_content: str, language: str) -> Tuple[List[FuncInfo], List[ClassInfo]]:
         """
         Extract functions and classes from code content.
         
+        Results are cached by content hash, so the tests, documentation and
+        explanation requests for the same file only parse it once.
+        
         Args:
             code_content: Content of the code file
             language: Programming language of the code
@@ -176,100 +977,65 @@ class CodeGenerator:
         Returns:
             Tuple of (functions, classes)
         """
-        functions = []
-        classes = []
+        key = self._elements_key(code_content, language)
+        cached = self._elements_cache.get(key)
+        if cached is not None:
+            return cached
         
-        try:
-            if language == 'python':
-                # Parse Python code with AST
-                tree = ast.parse(code_content)
-                
-                # Extract functions
-                for node in ast.iter_child_nodes(tree):
-                    if isinstance(node, ast.FunctionDef):
-                        functions.append({
-                            'name': node.name,
-                            'docstring': ast.get_docstring(node),
-                            'args': [arg.arg for arg in node.args.args],
-                            'line_start': node.lineno,
-                            'line_end': node.end_lineno if hasattr(node, 'end_lineno') else node.lineno
-                        })
-                    
-                    elif isinstance(node, ast.ClassDef):
-                        class_methods = []
-                        
-                        for child in ast.iter_child_nodes(node):
-                            if isinstance(child, ast.FunctionDef):
-                                class_methods.append({
-                                    'name': child.name,
-                                    'docstring': ast.get_docstring(child),
-                                    'args': [arg.arg for arg in child.args.args],
-                                    'line_start': child.lineno,
-                                    'line_end': child.end_lineno if hasattr(child, 'end_lineno') else child.lineno
-                                })
-                        
-                        classes.append({
-                            'name': node.name,
-                            'docstring': ast.get_docstring(node),
-                            'methods': class_methods,
-                            'line_start': node.lineno,
-                            'line_end': node.end_lineno if hasattr(node, 'end_lineno') else node.lineno
-                        })
+        elements = extract_code_elements(code_content, language)
+        self._remember_code_elements(key, elements)
+        return elements
+    
+    def _elements_key(self, code_content: str, language: str) -> Tuple[str, bytes]:
+        """Key for the extracted code elements cache"""
+        return language, hashlib.blake2b(code_content.encode('utf-8'), digest_size=8).digest()
+    
+    def _remember_code_elements(self, key: Tuple[str, bytes], elements: Tuple[List[FuncInfo], List[ClassInfo]]):
+        """Store extracted code elements, evicting the oldest entry when full"""
+        self._elements_cache[key] = elements
+        if len(self._elements_cache) > _ELEMENTS_CACHE_SIZE:
+            self._elements_cache.popitem(last=False)
+    
+    def _summarize_code_elements(self, functions: List[FuncInfo], classes: List[ClassInfo]) -> Tuple[str, str]:
+        """
+        Build the bullet-list summaries of functions and classes used in prompts.
+        
+        Args:
+            functions: List of functions in the code
+            classes: List of classes in the code
             
-            elif language in ['javascript', 'typescript']:
-                # Simple regex-based extraction for JS/TS
-                # This is a simplified approach; a proper parser would be better
-                
-                # Extract functions
-                function_pattern = r'(async\s+)?function\s+(\w+)\s*\(([^)]*)\)'
-                func_matches = re.finditer(function_pattern, code_content)
-                
-                for match in func_matches:
-                    functions.append({
-                        'name': match.group(2),
-                        'args': [arg.strip() for arg in match.group(3).split(',') if arg.strip()],
-                        'is_async': match.group(1) is not None
-                    })
-                
-                # Extract arrow functions
-                arrow_func_pattern = r'const\s+(\w+)\s*=\s*(async\s+)?\(([^)]*)\)\s*=>'
-                arrow_matches = re.finditer(arrow_func_pattern, code_content)
-                
-                for match in arrow_matches:
-                    functions.append({
-                        'name': match.group(1),
-                        'args': [arg.strip() for arg in match.group(3).split(',') if arg.strip()],
-                        'is_async': match.group(2) is not None
-                    })
-                
-                # Extract classes
-                class_pattern = r'class\s+(\w+)(?:\s+extends\s+(\w+))?\s*{'
-                class_matches = re.finditer(class_pattern, code_content)
-                
-                for match in class_matches:
-                    classes.append({
-                        'name': match.group(1),
-                        'extends': match.group(2) if match.group(2) else None
-                    })
+        Returns:
+            Tuple of (function_summary, class_summary), empty strings when there is nothing to list
+        """
+        buf = io.StringIO()
+        for f in functions:
+            buf.write('- ')
+            buf.write(f.name)
+            buf.write('(')
+            buf.write(', '.join(f.args))
+            buf.write(')\n')
+        function_summary = buf.getvalue().rstrip('\n')
         
-        except Exception as e:
-            logger.error(f"Error extracting code elements: {e}")
+        buf = io.StringIO()
+        for c in classes:
+            buf.write('- ')
+            buf.write(c.name)
+            buf.write('\n')
+        class_summary = buf.getvalue().rstrip('\n')
         
-        return functions, classes
+        return function_summary, class_summary
     
     def _create_test_prompt(
         self, 
-        code_content: str, 
         file_path: str, 
         language: str, 
-        functions: List[Dict[str, Any]], 
-        classes: List[Dict[str, Any]]
+        functions: List[FuncInfo], 
+        classes: List[ClassInfo]
     ) -> str:
         """
         Create a prompt for test generation.
         
         Args:
-            code_content: Content of the code file
             file_path: Path to the code file
             language: Programming language of the code
             functions: List of functions in the code
@@ -279,67 +1045,29 @@ class CodeGenerator:
             Prompt for test generation
         """
         # Create a summary of functions and classes
-        function_summary = "\n".join([f"- {f['name']}({', '.join(f.get('args', []))})" for f in functions])
-        class_summary = "\n".join([f"- {c['name']}" for c in classes])
+        function_summary, class_summary = self._summarize_code_elements(functions, classes)
         
-        # Create test framework recommendations based on language
-        test_framework = {
-            'python': 'pytest or unittest',
-            'javascript': 'Jest or Mocha',
-            'typescript': 'Jest or Jasmine',
-            'java': 'JUnit',
-            'cpp': 'Google Test (gtest) or Catch2',
-            'csharp': 'xUnit or NUnit',
-            'go': 'testing package',
-            'ruby': 'RSpec or Minitest',
-            'php': 'PHPUnit',
-            'rust': 'the built-in testing framework'
-        }.get(language, 'a suitable testing framework')
-        
-        prompt = f"""You are a test-driven development expert. Your task is to create comprehensive tests for the following code.
-
-                    File: {file_path}
-                    Language: {language}
-
-                    Here's the code to test:
-
-                    ```{language}
-                    {code_content}
-                    ```
-
-                    Functions in this code:
-                    {function_summary if function_summary else "No functions extracted."}
-
-                    Classes in this code:
-                    {class_summary if class_summary else "No classes extracted."}
-
-                    Please generate test code using {test_framework} that covers:
-                    1. All public functions and methods with multiple test cases
-                    2. Edge cases and error handling
-                    3. Different input scenarios
-                    4. Appropriate mocking of dependencies when necessary
-
-                    Make the tests specific to this code, with actual function names and realistic inputs and expected outputs.
-                    Include setup and teardown as appropriate. Structure the tests logically with clear descriptions.
-
-                    Generated test code:
-                    """
+        prompt = _TEST_PROMPT.substitute(
+            file_path=file_path,
+            language=language,
+            function_summary=function_summary or 'No functions extracted.',
+            class_summary=class_summary or 'No classes extracted.',
+            test_framework=_TEST_FRAMEWORK.get(language, 'a suitable testing framework')
+        )
         
         return prompt
     
     def _create_documentation_prompt(
         self, 
-        code_content: str, 
         file_path: str, 
         language: str, 
-        functions: List[Dict[str, Any]], 
-        classes: List[Dict[str, Any]]
+        functions: List[FuncInfo], 
+        classes: List[ClassInfo]
     ) -> str:
         """
         Create a prompt for documentation generation.
         
         Args:
-            code_content: Content of the code file
             file_path: Path to the code file
             language: Programming language of the code
             functions: List of functions in the code
@@ -348,44 +1076,10 @@ class CodeGenerator:
         Returns:
             Prompt for documentation generation
         """
-        # Determine documentation format based on language
-        doc_format = {
-            'python': 'Google style or NumPy style docstrings',
-            'javascript': 'JSDoc',
-            'typescript': 'TSDoc or JSDoc',
-            'java': 'Javadoc',
-            'cpp': 'Doxygen',
-            'csharp': 'XML documentation comments',
-            'go': 'godoc style comments',
-            'ruby': 'YARD',
-            'php': 'PHPDoc',
-            'rust': 'rustdoc'
-        }.get(language, 'appropriate documentation format')
+        prompt = _DOC_PROMPT.substitute(
+            file_path=file_path,
+            language=language,
+            doc_format=_DOC_FORMAT.get(language, 'appropriate documentation format')
+        )
         
-        prompt = f"""You are a documentation expert. Your task is to create comprehensive documentation for the following code.
-
-                    File: {file_path}
-                    Language: {language}
-
-                    Here's the code to document:
-
-                    ```{language}
-                    {code_content}
-                    ```
-
-                    Please generate detailed documentation in {doc_format} format for this code, including:
-
-                    1. A file-level overview explaining the purpose and functionality
-                    2. Documentation for each function and class, with:
-                    - Description of purpose
-                    - Parameters and return values with types
-                    - Examples of usage where helpful
-                    - Any exceptions or errors that might be thrown
-
-                    Create the documentation in a format that could be directly inserted into the original code.
-                    Be specific to this code, with accurate function names, parameter names, and descriptions.
-
-                    Generated documentation:
-                    """
-        
-        return prompt
\ No newline at end of file
+        return prompt
@@ -5,36 +5,307 @@ Transformers or llama.cpp with automatic GPU detection and fallback.
 import os
 import logging
 import threading
-import time
-import tempfile
-import httpx
 import platform
-from typing import List, Dict, Any
+import importlib.util
+from typing import List, Dict, Any, Iterator, Optional
 from pathlib import Path
 
 from utils.progress import start_operation, update_progress, complete_operation
 
 logger = logging.getLogger('github_repo_analyzer')
 
+# Use the multi-threaded Rust downloader for model files when it is installed. huggingface_hub
+# reads this once at import, so it has to be set before the first import of huggingface_hub.
+if importlib.util.find_spec('hf_transfer') is not None:
+    os.environ.setdefault('HF_HUB_ENABLE_HF_TRANSFER', '1')
+
+# GGUF quantizations of the chat model, in order of preference. On CPUs with int8 dot-product
+# instructions llama.cpp repacks Q4_0 weights into interleaved blocks at load time, which makes it
+# the fastest 4-bit format there; elsewhere Q4_K_S moves the fewest bytes per weight. When the
+# model is offloaded to a GPU, memory bandwidth is less of a concern and Q4_K_M keeps more quality.
+_QUANTS_GPU = ('Q4_K_M', 'Q4_K_S', 'Q4_0')
+_QUANTS_CPU_REPACK = ('Q4_0', 'Q4_K_S', 'Q4_K_M')
+_QUANTS_CPU = ('Q4_K_S', 'Q4_K_M', 'Q4_0')
+
+# CPU flags (as named in /proc/cpuinfo) that enable llama.cpp's repacked Q4_0 kernels
+_REPACK_CPU_FLAGS = frozenset({'avx2', 'avx_vnni', 'avx512_vnni', 'i8mm', 'asimddot'})
+
+# Windows IsProcessorFeaturePresent feature ids
+_PF_AVX2_INSTRUCTIONS_AVAILABLE = 40
+_PF_ARM_V82_DP_INSTRUCTIONS_AVAILABLE = 43
+
+# Hugging Face cache directory holding the chat model's snapshots
+_GGUF_SNAPSHOTS_DIR = os.path.expanduser("~/.cache/huggingface/hub/models--TheBloke--Llama-2-7B-Chat-GGUF/snapshots/")
+
+# Resolved local GGUF files, keyed by (snapshots dir, quantization preference), with the
+# snapshots dir mtime they were resolved at
+_local_gguf_cache: Dict[tuple, tuple] = {}
+
+# Read size used when pre-faulting the model file into the page cache
+PREFETCH_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Context window of the llama.cpp model and the tokens reserved for the answer. The prompt
+# gets what is left, less PROMPT_SAFETY_TOKENS for special tokens and estimation error.
+# Prompt tokens are estimated as CHARS_PER_TOKEN characters each; code tokenizes at about
+# 3 characters per token, denser than English prose.
+CONTEXT_WINDOW_TOKENS = 4096
+MAX_NEW_TOKENS = 2048
+PROMPT_SAFETY_TOKENS = 128
+CHARS_PER_TOKEN = 3
+
+# Appended to context items cut to fit the budget
+_TRUNCATION_MARKER = "\n... (truncated)"
+
+# One context item in the generation prompt
+_CONTEXT_TEMPLATE = "Context {i}:\nFile: {path} (Lines {start}-{end})\nCode:\n{content}\n\n"
+
+# The generation prompt, with the rendered context items and the question
+_PROMPT_TEMPLATE = """You are an AI assistant that answers questions about GitHub repositories. 
+You have been provided with the following code context:
+
+{context_text}
+
+Based only on the context above, please answer the following question:
+{question}
+
+If the context doesn't contain enough information to answer the question, 
+please say so rather than making up information.
+
+Answer:
+"""
+
+
+def _cpu_flags() -> frozenset:
+    """Best-effort set of CPU feature flags, lowercase, empty if they can't be determined."""
+    flags = set()
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            for line in f:
+                # x86 reports "flags", ARM reports "Features"
+                key, _, value = line.partition(':')
+                if key.strip() in ('flags', 'Features'):
+                    flags.update(value.split())
+                    break
+    except OSError:
+        pass
+    
+    if not flags and platform.system() == "Windows":
+        try:
+            import ctypes
+            is_present = ctypes.windll.kernel32.IsProcessorFeaturePresent
+            if is_present(_PF_AVX2_INSTRUCTIONS_AVAILABLE):
+                flags.add('avx2')
+            if is_present(_PF_ARM_V82_DP_INSTRUCTIONS_AVAILABLE):
+                flags.add('asimddot')
+        except Exception:
+            pass
+    
+    return frozenset(flag.lower() for flag in flags)
+
+def _physical_core_count() -> int:
+    """Number of physical CPU cores; decode slows down when threads share a core."""
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    except ImportError:
+        pass
+    
+    # Linux: count distinct (physical id, core id) pairs
+    try:
+        cores = set()
+        physical_id = core_id = None
+        with open('/proc/cpuinfo', 'r') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                key = key.strip()
+                if key == 'physical id':
+                    physical_id = value.strip()
+                elif key == 'core id':
+                    core_id = value.strip()
+                elif not key:
+                    if core_id is not None:
+                        cores.add((physical_id, core_id))
+                    physical_id = core_id = None
+        if core_id is not None:
+            cores.add((physical_id, core_id))
+        if cores:
+            return len(cores)
+    except OSError:
+        pass
+    
+    # Assume two hardware threads per core, as llama-cpp-python does by default
+    return max((os.cpu_count() or 2) // 2, 1)
+
+def _preferred_quantizations(gpu_available: bool) -> tuple:
+    """Quantization tiers to look for, best first, for this machine."""
+    if gpu_available:
+        return _QUANTS_GPU
+    
+    # Apple silicon has no /proc/cpuinfo, but every arm64 Mac supports dot-product instructions
+    if platform.system() == "Darwin" and platform.machine() == "arm64":
+        return _QUANTS_CPU_REPACK
+    
+    if _cpu_flags() & _REPACK_CPU_FLAGS:
+        return _QUANTS_CPU_REPACK
+    return _QUANTS_CPU
+
+def _select_gguf_file(gguf_files: List[str], quants: tuple) -> str:
+    """Pick the GGUF file matching the most preferred quantization available."""
+    for quant in quants:
+        for file_name in sorted(gguf_files):
+            # TheBloke-style names: <model>.<QUANT>.gguf
+            if quant in file_name.upper().split('.'):
+                return file_name
+    
+    # Unknown naming scheme: prefer any 4-bit file, then anything
+    preferred_models = [f for f in gguf_files if 'Q4' in f.upper()]
+    return preferred_models[0] if preferred_models else gguf_files[0]
+
+def _find_local_gguf(snapshots_dir: str, quants: tuple) -> Optional[str]:
+    """
+    Find the preferred GGUF file in the latest local model snapshot.
+    
+    The result is cached until the snapshots directory changes, so repeated
+    model loads skip listing and sorting the cache.
+    
+    Args:
+        snapshots_dir: Hugging Face cache snapshots directory of the model
+        quants: Quantizations in order of preference
+        
+    Returns:
+        Path to the GGUF file, or None if there is no local model
+    """
+    try:
+        mtime = os.stat(snapshots_dir).st_mtime_ns
+    except OSError:
+        return None
+    
+    key = (snapshots_dir, quants)
+    cached = _local_gguf_cache.get(key)
+    if cached is not None and cached[0] == mtime and os.path.exists(cached[1]):
+        return cached[1]
+    
+    snapshot_dirs = [d for d in os.listdir(snapshots_dir) if os.path.isdir(os.path.join(snapshots_dir, d))]
+    if not snapshot_dirs:
+        return None
+    latest_dir = os.path.join(snapshots_dir, sorted(snapshot_dirs)[-1])
+    logger.info(f"Found latest snapshot: {latest_dir}")
+    
+    gguf_files = [f for f in os.listdir(latest_dir) if f.endswith('.gguf')]
+    if not gguf_files:
+        return None
+    
+    # Prefer the 4-bit quantization with the fastest kernels on this machine
+    model_path = os.path.join(latest_dir, _select_gguf_file(gguf_files, quants))
+    _local_gguf_cache[key] = (mtime, model_path)
+    return model_path
+
+def _context_char_limits(contents: List[str], budget: int) -> List[int]:
+    """
+    Split a character budget across context items.
+    
+    Items shorter than an even share keep their full length and leave the rest of
+    their share to the longer items.
+    
+    Args:
+        contents: Contents of the context items
+        budget: Total characters available
+        
+    Returns:
+        Maximum characters for each item, in the same order
+    """
+    limits = [0] * len(contents)
+    remaining = budget
+    order = sorted(range(len(contents)), key=lambda i: len(contents[i]))
+    for n, i in enumerate(order):
+        limits[i] = min(len(contents[i]), remaining // (len(order) - n))
+        remaining -= limits[i]
+    return limits
+
+def _prompt_context_chars(question: str, context: List[Dict[str, Any]]) -> int:
+    """
+    Characters available for context item contents in the generation prompt.
+    
+    The prompt template, the question and each item's header are taken out of the
+    tokens left after reserving the answer.
+    
+    Args:
+        question: The question included in the prompt
+        context: Context items included in the prompt
+        
+    Returns:
+        Total characters available for the items' contents, possibly 0
+    """
+    fixed_chars = len(_PROMPT_TEMPLATE.format(context_text="", question=question))
+    for i, ctx in enumerate(context, 1):
+        fixed_chars += len(_CONTEXT_TEMPLATE.format(
+            i=i, path=ctx['path'], start=ctx['start_line'], end=ctx['end_line'], content=""
+        ))
+    
+    prompt_tokens = CONTEXT_WINDOW_TOKENS - MAX_NEW_TOKENS - PROMPT_SAFETY_TOKENS
+    return max(0, prompt_tokens * CHARS_PER_TOKEN - fixed_chars)
+
+def _truncate_context(content: str, max_chars: int) -> str:
+    """Cut context content to max_chars at a line boundary, keeping a leading code fence closed."""
+    if len(content) <= max_chars:
+        return content
+    
+    # The marker and closing fence count towards max_chars
+    suffix = _TRUNCATION_MARKER
+    fence_len = len(content) - len(content.lstrip('`'))
+    if fence_len >= 3:
+        suffix += '\n' + '`' * fence_len
+    
+    room = max(0, max_chars - len(suffix))
+    cut = content.rfind('\n', 0, room)
+    return content[:cut if cut > 0 else room] + suffix
+
+def _prefetch_file(path: str):
+    """Read a file sequentially so its pages are in the page cache before they are used."""
+    try:
+        with open(path, 'rb', buffering=0) as f:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            buffer = bytearray(PREFETCH_CHUNK_SIZE)
+            while f.readinto(buffer):
+                pass
+        logger.info(f"Prefetched model file into page cache: {path}")
+    except OSError as e:
+        logger.warning(f"Error prefetching model file {path}: {e}")
+
 class LLMGenerator:
-    def __init__(self, model_name: str, use_llama_cpp: bool = True):
+    def __init__(self, model_name: str, use_llama_cpp: bool = True, preload: bool = True):
         """
         Initialize the LLM generator.
         
         Args:
             model_name: Name or path of the model to use
             use_llama_cpp: Whether to use llama.cpp for inference
+            preload: Whether to start loading the model in a background thread
         """
         self.model_name = model_name
         self.use_llama_cpp = use_llama_cpp
         self.model = None
         self.tokenizer = None
-        self.model_loading = False
-        self.model_loaded = False
         self.model_loading_lock = threading.Lock()
+        self._loaded_event = None  # Set by the loading thread once the current load attempt ends
         self.operation_id = "llm_model_loading"
         self.gpu_available = False
         logger.info(f"LLMGenerator initialized with model name: {model_name}, using llama.cpp: {use_llama_cpp}")
+        
+        if preload:
+            # Load in the background so retrieval and repo work overlap with model IO
+            threading.Thread(target=self._preload_model, name="llm-preload", daemon=True).start()
+    
+    def _preload_model(self):
+        """Load the model in a background thread, leaving failures to be retried on first use."""
+        try:
+            self._load_model()
+        except Exception:
+            # Already logged and reported by _load_model; generate() retries the load
+            pass
     
     def _check_gpu_availability(self):
         """Check if GPU is available for acceleration."""
@@ -91,233 +362,132 @@ class LLMGenerator:
         if self.model is not None:
             return
             
-        # Use a lock to prevent multiple threads from loading the model simultaneously
+        # Use a lock only to elect a single loading thread; the load itself runs outside it
         with self.model_loading_lock:
             # Check again after acquiring the lock in case another thread loaded the model
             if self.model is not None:
                 return
                 
-            if self.model_loading:
-                # Wait for model to be loaded by another thread
-                logger.info("Waiting for LLM model to be loaded by another thread...")
-                while self.model_loading and not self.model_loaded:
-                    time.sleep(0.1)
-                return
+            loaded_event = self._loaded_event
+            if loaded_event is None:
+                # No load in progress, this thread loads the model
+                self._loaded_event = threading.Event()
                 
-            # Mark that we're loading the model
-            self.model_loading = True
-            start_operation(self.operation_id, "Loading LLM model")
+        if loaded_event is not None:
+            # Wait for model to be loaded by another thread
+            logger.info("Waiting for LLM model to be loaded by another thread...")
+            loaded_event.wait()
+            if self.model is None:
+                raise RuntimeError("LLM model failed to load")
+            return
             
-            try:
-                logger.info("Loading LLM model...")
-                update_progress(self.operation_id, 0.1, "Initializing model loading...")
-                
-                # Check GPU availability
-                self.gpu_available = self._check_gpu_availability()
-                update_progress(self.operation_id, 0.15, 
-                               f"GPU acceleration {'available' if self.gpu_available else 'not available'}")
-                
-                if self.use_llama_cpp:
-                    logger.info("Initializing llama.cpp model")
-                    update_progress(self.operation_id, 0.2, "Setting up llama.cpp...")
-                    self.model = self._initialize_llama_cpp()
-                    logger.info("llama.cpp model initialized successfully")
-                else:
-                    logger.info("Initializing Transformers model")
-                    update_progress(self.operation_id, 0.2, "Loading tokenizer...")
-                    from transformers import AutoTokenizer, AutoModelForCausalLM
-                    self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-                    
-                    update_progress(self.operation_id, 0.4, "Loading model weights...")
-                    self.model = AutoModelForCausalLM.from_pretrained(self.model_name)
-                    
-                    # Move model to GPU if available
-                    if self.gpu_available:
-                        update_progress(self.operation_id, 0.6, "Moving model to GPU...")
-                        import torch
-                        self.model = self.model.to(torch.device("cuda"))
-                        
-                    logger.info("Transformers model initialized successfully")
-                
-                self.model_loaded = True
-                complete_operation(self.operation_id, True, "LLM model loaded successfully")
-            except Exception as e:
-                logger.error(f"Error loading LLM model: {e}")
-                complete_operation(self.operation_id, False, f"Error loading model: {str(e)}")
-                raise
-            finally:
-                self.model_loading = False
-    
-    def _download_file_with_progress(self, url, target_path):
-        """Download a file with progress reporting."""
-        total_size = 0
-        downloaded = 0
-        temp_file = None
+        self._load_model_now()
+    
+    def _load_model_now(self):
+        """Load the model in the calling thread and signal any waiting threads."""
+        start_operation(self.operation_id, "Loading LLM model")
         
         try:
-            # First, make a HEAD request to get the content size
-            with httpx.Client() as client:
-                head_response = client.head(url)
-                if 'content-length' in head_response.headers:
-                    total_size = int(head_response.headers['content-length'])
-                    logger.info(f"File size: {total_size / 1024 / 1024:.1f} MB")
-                    update_progress(self.operation_id, 0.25, f"Starting download: {total_size / 1024 / 1024:.1f} MB")
+            logger.info("Loading LLM model...")
+            update_progress(self.operation_id, 0.1, "Initializing model loading...")
             
-            # Download the file with streaming and progress reporting
-            temp_file = tempfile.NamedTemporaryFile(delete=False)
-            with httpx.Client() as client:
-                with client.stream('GET', url) as response:
-                    response.raise_for_status()
-                    
-                    # If we didn't get the size from HEAD request, try to get it now
-                    if total_size == 0 and 'content-length' in response.headers:
-                        total_size = int(response.headers['content-length'])
-                    
-                    # Download the file in chunks, reporting progress
-                    for chunk in response.iter_bytes(chunk_size=1024 * 1024):  # 1MB chunks
-                        temp_file.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        if total_size > 0:
-                            progress = min(downloaded / total_size, 0.95)  # Cap at 95% to leave room for post-processing
-                            update_progress(
-                                self.operation_id,
-                                0.3 + progress * 0.6,
-                                f"Downloading: {downloaded / 1024 / 1024:.1f}MB / {total_size / 1024 / 1024:.1f}MB"
-                            )
-                        else:
-                            update_progress(
-                                self.operation_id,
-                                0.5,
-                                f"Downloading: {downloaded / 1024 / 1024:.1f}MB (total size unknown)"
-                            )
+            # Check GPU availability
+            self.gpu_available = self._check_gpu_availability()
+            update_progress(self.operation_id, 0.15, 
+                           f"GPU acceleration {'available' if self.gpu_available else 'not available'}")
             
-            # Close the temp file and move it to the target path
-            temp_file.close()
-            os.makedirs(os.path.dirname(target_path), exist_ok=True)
-            os.replace(temp_file.name, target_path)
-            return target_path
+            if self.use_llama_cpp:
+                logger.info("Initializing llama.cpp model")
+                update_progress(self.operation_id, 0.2, "Setting up llama.cpp...")
+                self.model = self._initialize_llama_cpp()
+                logger.info("llama.cpp model initialized successfully")
+            else:
+                logger.info("Initializing Transformers model")
+                update_progress(self.operation_id, 0.2, "Loading tokenizer...")
+                from transformers import AutoTokenizer, AutoModelForCausalLM
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                
+                update_progress(self.operation_id, 0.4, "Loading model weights...")
+                if self.gpu_available:
+                    # Load FP16 weights straight onto the GPU, quantized to 4-bit when bitsandbytes is installed
+                    self.model = AutoModelForCausalLM.from_pretrained(self.model_name, **self._gpu_model_kwargs())
+                else:
+                    self.model = AutoModelForCausalLM.from_pretrained(self.model_name)
+                    
+                logger.info("Transformers model initialized successfully")
             
+            complete_operation(self.operation_id, True, "LLM model loaded successfully")
         except Exception as e:
-            logger.error(f"Error downloading file: {e}")
-            if temp_file:
-                temp_file.close()
-                try:
-                    os.unlink(temp_file.name)
-                except:
-                    pass
+            logger.error(f"Error loading LLM model: {e}")
+            complete_operation(self.operation_id, False, f"Error loading model: {str(e)}")
             raise
+        finally:
+            with self.model_loading_lock:
+                loaded_event = self._loaded_event
+                if self.model is None:
+                    # Allow a later call to retry the load
+                    self._loaded_event = None
+            loaded_event.set()
+
+    def _gpu_model_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for loading a Transformers model on the GPU."""
+        import torch
+        kwargs = {'torch_dtype': torch.float16, 'device_map': 'auto'}
+        
+        # Generation is bound by weight bandwidth, so 4-bit weights decode faster than FP16
+        if importlib.util.find_spec('bitsandbytes') is not None:
+            from transformers import BitsAndBytesConfig
+            kwargs['quantization_config'] = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_compute_dtype=torch.float16
+            )
+            logger.info("Loading Transformers model with 4-bit bitsandbytes quantization")
+        else:
+            logger.info("bitsandbytes not installed, loading Transformers model in FP16")
+            
+        return kwargs
     
     def _initialize_llama_cpp(self):
         """Initialize the llama.cpp model."""
         logger.info("Looking for available GGUF models...")
         update_progress(self.operation_id, 0.3, "Looking for local GGUF models...")
         
-        # Look for available GGUF models
-        model_path = os.path.expanduser("~/.cache/huggingface/hub/models--TheBloke--Llama-2-7B-Chat-GGUF/snapshots/")
-        
-        # Find the latest snapshot directory
-        if os.path.exists(model_path):
-            logger.info(f"Looking in local cache: {model_path}")
-            snapshot_dirs = [d for d in os.listdir(model_path) if os.path.isdir(os.path.join(model_path, d))]
-            if snapshot_dirs:
-                latest_dir = sorted(snapshot_dirs)[-1]
-                model_path = os.path.join(model_path, latest_dir)
-                logger.info(f"Found latest snapshot: {latest_dir}")
-                update_progress(self.operation_id, 0.4, f"Found local model snapshot: {latest_dir}")
-                
-                # Find the GGUF file
-                gguf_files = [f for f in os.listdir(model_path) if f.endswith('.gguf')]
-                if gguf_files:
-                    # Prefer smaller quantized models for efficiency
-                    preferred_models = [f for f in gguf_files if 'Q4' in f]
-                    if preferred_models:
-                        model_file = preferred_models[0]
-                    else:
-                        model_file = gguf_files[0]
-                    
-                    model_path = os.path.join(model_path, model_file)
-                    logger.info(f"Using local model file: {model_file}")
-                    update_progress(self.operation_id, 0.5, f"Using local model file: {model_file}")
-                    
-                    # Initialize the Llama model
-                    logger.info("Initializing Llama model from local file")
-                    update_progress(self.operation_id, 0.6, "Loading model into memory...")
-                    from llama_cpp import Llama
-                    
-                    # Use GPU if available and supported by the library
-                    n_gpu_layers = -1 if self.gpu_available else 0
-                    logger.info(f"Using n_gpu_layers={n_gpu_layers} for llama.cpp")
-                    
-                    llm = Llama(
-                        model_path=model_path,
-                        n_ctx=4096,             # Context window size
-                        n_gpu_layers=n_gpu_layers,  # -1 means use all layers on GPU if available
-                        verbose=self.gpu_available  # Enable verbose output to see GPU usage info
-                    )
-                    update_progress(self.operation_id, 0.9, "Model loaded into memory")
-                    return llm
+        # Look for available GGUF models in the latest local snapshot
+        model_path = _find_local_gguf(_GGUF_SNAPSHOTS_DIR, _preferred_quantizations(self.gpu_available))
+        if model_path is not None:
+            model_file = os.path.basename(model_path)
+            logger.info(f"Using local model file: {model_path}")
+            update_progress(self.operation_id, 0.5, f"Using local model file: {model_file}")
+            
+            # Initialize the Llama model
+            logger.info("Initializing Llama model from local file")
+            update_progress(self.operation_id, 0.6, "Loading model into memory...")
+            llm = self._create_llama(model_path)
+            update_progress(self.operation_id, 0.9, "Model loaded into memory")
+            return llm
         
         # Fallback to downloading the model if not found locally
         logger.info("No local model found, downloading from Hugging Face Hub")
         update_progress(self.operation_id, 0.2, "No local model found, preparing to download...")
         
         try:
-            # Try to use huggingface_hub if available
             from huggingface_hub import hf_hub_download
             
-            # First try with modern style
-            try:
-                logger.info("Using huggingface_hub to download the model")
-                model_file = "llama-2-7b-chat.Q4_K_M.gguf"
-                
-                # Get direct link from Hugging Face API
-                repo_id = "TheBloke/Llama-2-7B-Chat-GGUF"
-                api_url = f"https://huggingface.co/api/models/{repo_id}/resolve/main/{model_file}"
-                
-                # Get the cache directory to create the same directory structure as HF
-                cache_dir = os.path.expanduser("~/.cache/huggingface/hub")
-                model_subdir = os.path.join(
-                    cache_dir, 
-                    "models--TheBloke--Llama-2-7B-Chat-GGUF",
-                    "snapshots",
-                    "latest",
-                    model_file
-                )
-                
-                # Download with progress
-                update_progress(self.operation_id, 0.25, f"Downloading {model_file}...")
-                model_path = self._download_file_with_progress(api_url, model_subdir)
-                
-            except Exception as e:
-                logger.error(f"Error with direct download: {e}")
-                # Fall back to using hf_hub_download
-                logger.info(f"Falling back to hf_hub_download")
-                update_progress(self.operation_id, 0.3, "Attempting download via huggingface_hub...")
-                
-                # Try to get progress, but this depends on HF version
-                model_path = hf_hub_download(
-                    repo_id="TheBloke/Llama-2-7B-Chat-GGUF",
-                    filename="llama-2-7b-chat.Q4_K_M.gguf",
-                    local_dir=None,  # Use default cache dir
-                    local_dir_use_symlinks=False
-                )
+            logger.info("Using huggingface_hub to download the model")
+            model_file = f"llama-2-7b-chat.{_preferred_quantizations(self.gpu_available)[0]}.gguf"
+            update_progress(self.operation_id, 0.25, f"Downloading {model_file}...")
+            
+            # Download into the shared cache; the snapshot entry is a symlink to the cached blob
+            model_path = hf_hub_download(
+                repo_id="TheBloke/Llama-2-7B-Chat-GGUF",
+                filename=model_file,
+                cache_dir=None  # Use default cache dir
+            )
             
             logger.info(f"Model downloaded to: {model_path}")
             update_progress(self.operation_id, 0.8, "Download complete, loading model...")
             
-            from llama_cpp import Llama
-            
-            # Use GPU if available and supported by the library
-            n_gpu_layers = -1 if self.gpu_available else 0
-            logger.info(f"Using n_gpu_layers={n_gpu_layers} for llama.cpp")
-            
-            llm = Llama(
-                model_path=model_path,
-                n_ctx=4096,
-                n_gpu_layers=n_gpu_layers,
-                verbose=self.gpu_available  # Enable verbose output to see GPU usage info
-            )
+            llm = self._create_llama(model_path)
             
             update_progress(self.operation_id, 0.95, "Model loaded into memory")
             return llm
@@ -327,6 +497,41 @@ class LLMGenerator:
             complete_operation(self.operation_id, False, f"Error downloading model: {str(e)}")
             raise
     
+    def _create_llama(self, model_path: str):
+        """Create the llama.cpp model for a GGUF file."""
+        import llama_cpp
+        
+        # Use GPU if available and supported by the library
+        n_gpu_layers = -1 if self.gpu_available else 0
+        logger.info(f"Using n_gpu_layers={n_gpu_layers} for llama.cpp")
+        
+        n_threads = _physical_core_count()
+        logger.info(f"Using {n_threads} threads for llama.cpp")
+        
+        llm = llama_cpp.Llama(
+            model_path=model_path,
+            n_ctx=CONTEXT_WINDOW_TOKENS,  # Context window size
+            n_gpu_layers=n_gpu_layers,  # -1 means use all layers on GPU if available
+            n_threads=n_threads,        # One thread per physical core for decoding
+            n_threads_batch=n_threads,  # and for prompt processing
+            n_batch=512,                # Prompt tokens evaluated per call
+            n_ubatch=512,               # Physical batch size used by the compute kernels
+            flash_attn=True,            # Fused attention; also required for a quantized V cache
+            offload_kqv=True,           # Keep the KV cache on the GPU when layers are offloaded
+            type_k=llama_cpp.GGML_TYPE_Q8_0,  # 8-bit KV cache halves its memory traffic
+            type_v=llama_cpp.GGML_TYPE_Q8_0,
+            use_mmap=True,              # Map the weights instead of copying them into memory
+            use_mlock=False,            # Let the OS page the weights rather than pinning 4 GB
+            verbose=self.gpu_available  # Enable verbose output to see GPU usage info
+        )
+        
+        if not self.gpu_available:
+            # CPU inference reads the weights through the mmap; fault them in with one sequential
+            # read in the background instead of random page faults during the first generation
+            threading.Thread(target=_prefetch_file, args=(model_path,), name="llm-prefetch", daemon=True).start()
+        
+        return llm
+    
     def generate(self, question: str, context: List[Dict[str, Any]]) -> str:
         """
         Generate a response to the given question using the provided context.
@@ -370,63 +575,128 @@ class LLMGenerator:
             complete_operation(generation_id, False, f"Error generating response: {str(e)}")
             raise
     
+    def stream(self, question: str, context: List[Dict[str, Any]]) -> Iterator[str]:
+        """
+        Stream a response to the given question as it is generated.
+        
+        Args:
+            question: The user's question
+            context: List of context items from FAISS search
+            
+        Yields:
+            Chunks of the generated response
+        """
+        # Lazy load the model when needed
+        self._load_model()
+        
+        # Prepare the prompt with context
+        logger.info("Creating prompt with context")
+        prompt = self._create_prompt(question, context)
+        
+        # Start generation operation
+        generation_id = "llm_generation"
+        start_operation(generation_id, "Generating answer")
+        update_progress(generation_id, 0.1, "Processing question...")
+        
+        try:
+            if self.use_llama_cpp:
+                logger.info("Streaming response with llama.cpp")
+                update_progress(generation_id, 0.3, f"Generating response with LLaMA {'with GPU acceleration' if self.gpu_available else 'on CPU'}...")
+                chunks = self._stream_with_llama_cpp(prompt)
+            else:
+                # Transformers generation isn't streamed; yield the whole response at once
+                logger.info("Generating response with Transformers")
+                update_progress(generation_id, 0.3, f"Generating response with Transformers {'on GPU' if self.gpu_available else 'on CPU'}...")
+                chunks = iter([self._generate_with_transformers(prompt)])
+            
+            length = 0
+            for chunk in chunks:
+                length += len(chunk)
+                yield chunk
+                
+            logger.info(f"Streamed response of length: {length}")
+            complete_operation(generation_id, True, "Response generated successfully")
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            complete_operation(generation_id, False, f"Error generating response: {str(e)}")
+            raise
+    
     def _create_prompt(self, question: str, context: List[Dict[str, Any]]) -> str:
         """Create a prompt with the question and context."""
-        context_text = ""
-        for i, ctx in enumerate(context):
-            context_text += f"Context {i+1}:\n"
-            context_text += f"File: {ctx['path']} (Lines {ctx['start_line']}-{ctx['end_line']})\n"
-            context_text += f"Code:\n{ctx['content']}\n\n"
+        # Drop repeated context items, keeping the first (highest ranked) occurrence
+        seen = set()
+        unique_context = []
+        for ctx in context:
+            key = (ctx['path'], ctx['start_line'], ctx['end_line'])
+            if key not in seen:
+                seen.add(key)
+                unique_context.append(ctx)
         
-        prompt = f"""You are an AI assistant that answers questions about GitHub repositories. 
-You have been provided with the following code context:
-
-{context_text}
-
-Based only on the context above, please answer the following question:
-{question}
-
-If the context doesn't contain enough information to answer the question, 
-please say so rather than making up information.
-
-Answer:
-"""
-        return prompt
+        # Keep the prompt within the context window, leaving MAX_NEW_TOKENS for the answer
+        limits = _context_char_limits(
+            [ctx['content'] for ctx in unique_context], _prompt_context_chars(question, unique_context)
+        )
+        context_text = "".join([
+            _CONTEXT_TEMPLATE.format(
+                i=i, path=ctx['path'], start=ctx['start_line'], end=ctx['end_line'],
+                content=_truncate_context(ctx['content'], limit)
+            )
+            for i, (ctx, limit) in enumerate(zip(unique_context, limits), 1)
+        ])
+        
+        return _PROMPT_TEMPLATE.format(context_text=context_text, question=question)
     
     def _generate_with_llama_cpp(self, prompt: str) -> str:
         """Generate a response using llama.cpp."""
-        response = self.model(
+        response = self._llama_completion(prompt)
+        
+        return response['choices'][0]['text'].strip()
+    
+    def _stream_with_llama_cpp(self, prompt: str) -> Iterator[str]:
+        """Stream a response using llama.cpp, without the leading whitespace."""
+        started = False
+        for chunk in self._llama_completion(prompt, stream=True):
+            text = chunk['choices'][0]['text']
+            if not started:
+                text = text.lstrip()
+                if not text:
+                    continue
+                started = True
+            yield text
+    
+    def _llama_completion(self, prompt: str, stream: bool = False):
+        """Run a llama.cpp completion, returning the result or a chunk iterator when streaming."""
+        return self.model(
             prompt,
-            max_tokens=2048,
+            max_tokens=MAX_NEW_TOKENS,
             temperature=0.1,
             top_p=0.9,
             top_k=40,
             stop=["</s>", "User:", "Question:"],
-            echo=False
+            echo=False,
+            stream=stream
         )
-        
-        return response['choices'][0]['text'].strip()
     
     def _generate_with_transformers(self, prompt: str) -> str:
         """Generate a response using Transformers."""
-        inputs = self.tokenizer(prompt, return_tensors="pt")
+        import torch
         
-        # Move inputs to GPU if available
-        if self.gpu_available:
-            import torch
-            inputs = {k: v.to("cuda") for k, v in inputs.items()}
-            
-        outputs = self.model.generate(
-            inputs["input_ids"],
-            max_length=len(inputs["input_ids"][0]) + 2048,
-            temperature=0.1,
-            top_p=0.9,
-            top_k=40,
-            num_return_sequences=1,
-            pad_token_id=self.tokenizer.eos_token_id
-        )
+        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
+        prompt_len = inputs["input_ids"].shape[1]
+        
+        with torch.inference_mode(), torch.autocast(device_type="cuda", dtype=torch.float16, enabled=self.gpu_available):
+            outputs = self.model.generate(
+                inputs["input_ids"],
+                max_new_tokens=MAX_NEW_TOKENS,
+                temperature=0.1,
+                top_p=0.9,
+                top_k=40,
+                num_return_sequences=1,
+                pad_token_id=self.tokenizer.eos_token_id,
+                use_cache=True
+            )
         
-        response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        response = response[len(prompt):]  # Remove the prompt from the response
+        # Decode only the generated tokens, skipping the echoed prompt
+        response = self.tokenizer.decode(outputs[0][prompt_len:], skip_special_tokens=True)
         
-        return response.strip()
\ No newline at end of file
+        return response.strip()
@@ -3,9 +3,36 @@ GitHub repository handling module.
 """
 import os
 import git
-import glob
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+from utils.hashing import content_hash, text_hash
+
+logger = logging.getLogger('github_repo_analyzer')
+
+# Extensions of the files collected for analysis
+CODE_EXTENSIONS = frozenset({
+    '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.c', '.cpp', '.h',
+    '.hpp', '.cs', '.go', '.rb', '.php', '.swift', '.kt', '.rs'
+})
+
+# Threads used to read file contents; reads are I/O-bound and release the GIL
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Files larger than this are skipped (minified bundles, generated lockfiles)
+MAX_FILE_SIZE = 1_000_000
+
+# Bytes sniffed for NUL characters to detect binary files
+BINARY_SNIFF_SIZE = 8192
+
+# Dependency, virtualenv and build-output directories never descended into, in addition to
+# hidden ones (.git etc.)
+SKIP_DIRS = frozenset({'node_modules', 'venv', '__pycache__', 'dist', 'build', 'target'})
+
+# Clone options that skip history, other branches, tags and unreferenced blobs
+SHALLOW_CLONE_OPTIONS = ['--depth=1', '--single-branch', '--filter=blob:none', '--no-tags']
 
 class GitHubRepo:
     def __init__(self, repo_url: str, base_dir: str, github_token: str = None):
@@ -28,49 +55,94 @@ class GitHubRepo:
     def clone(self) -> Path:
         """Clone the repository."""
         if self.repo_path.exists():
-            # Repository already exists, just pull latest changes
+            # Repository already exists, fetch only the latest commit and move to it
             repo = git.Repo(self.repo_path)
-            origin = repo.remotes.origin
-            origin.pull()
+            repo.remotes.origin.fetch(depth=1)
+            repo.git.reset('--hard', 'FETCH_HEAD')
         else:
-            # Clone new repository
-            git.Repo.clone_from(self.repo_url, self.repo_path)
+            # Shallow, blobless clone; only the current tree is needed for analysis
+            git.Repo.clone_from(self.repo_url, self.repo_path, multi_options=SHALLOW_CLONE_OPTIONS)
        
         return self.repo_path
    
     def get_code_files(self) -> List[Dict[str, Any]]:
         """Get all code files from the repository."""
-        code_extensions = [
-            '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.c', '.cpp', '.h',
-            '.hpp', '.cs', '.go', '.rb', '.php', '.swift', '.kt', '.rs'
-        ]
-       
-        code_files = []
-       
-        for ext in code_extensions:
-            pattern = str(self.repo_path) + f"/**/*{ext}"
-            files = glob.glob(pattern, recursive=True)
-           
-            for file_path in files:
-                rel_path = os.path.relpath(file_path, str(self.repo_path))
-               
-                # Skip files in .git directory, node_modules, etc.
-                if any(part.startswith('.') for part in Path(rel_path).parts) or \
-                   'node_modules' in Path(rel_path).parts or \
-                   'venv' in Path(rel_path).parts:
-                    continue
-               
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                   
-                    code_files.append({
-                        'path': rel_path,
-                        'full_path': file_path,
-                        'content': content,
-                        'extension': ext
-                    })
-                except Exception as e:
-                    print(f"Error reading {file_path}: {e}")
-       
-        return code_files
\ No newline at end of file
+        candidates = self._find_code_files()
+        
+        # Read the files concurrently to overlap per-file open/read latency
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+            results = pool.map(self._read_code_file, candidates)
+            return [result for result in results if result is not None]
+    
+    def _find_code_files(self) -> List[Tuple[str, str, str]]:
+        """
+        Find code files with a single walk over the tree.
+        
+        Hidden and skipped directories are pruned rather than filtered afterwards.
+        
+        Returns:
+            List of (full_path, rel_path, extension) tuples
+        """
+        candidates = []
+        stack = [(str(self.repo_path), '')]
+        while stack:
+            dir_path, rel_dir = stack.pop()
+            try:
+                entries = os.scandir(dir_path)
+            except OSError as e:
+                logger.error(f"Error reading {dir_path}: {e}")
+                continue
+            
+            with entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith('.'):
+                        continue
+                    rel_path = os.path.join(rel_dir, name) if rel_dir else name
+                    
+                    if entry.is_dir(follow_symlinks=False):
+                        if name not in SKIP_DIRS:
+                            stack.append((entry.path, rel_path))
+                        continue
+                    
+                    ext = os.path.splitext(name)[1]
+                    if ext not in CODE_EXTENSIONS:
+                        continue
+                    try:
+                        if entry.stat().st_size > MAX_FILE_SIZE:
+                            continue
+                    except OSError as e:
+                        logger.error(f"Error reading {entry.path}: {e}")
+                        continue
+                    candidates.append((entry.path, rel_path, ext))
+        
+        return candidates
+    
+    def _read_code_file(self, candidate: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        """Read one code file, returning None if it can't be read or is binary."""
+        full_path, rel_path, ext = candidate
+        try:
+            with open(full_path, 'rb') as f:
+                data = f.read(MAX_FILE_SIZE + 1)
+            if len(data) > MAX_FILE_SIZE or b'\x00' in data[:BINARY_SNIFF_SIZE]:
+                return None
+            content = data.decode('utf-8')
+            if b'\r' in data:
+                # Universal newlines, as text-mode open() would give (e.g. autocrlf checkouts)
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
+                file_hash = text_hash(content)
+            else:
+                # Hash the raw bytes while they're at hand; equals text_hash(content)
+                file_hash = content_hash(data)
+        except Exception as e:
+            logger.error(f"Error reading {full_path}: {e}")
+            return None
+        
+        return {
+            'path': rel_path,
+            'full_path': full_path,
+            'content': content,
+            'extension': ext,
+            # Same as the hash DependencyAnalyzer computes from a text-mode read
+            'hash': file_hash
+        }
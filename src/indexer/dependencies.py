@@ -4,25 +4,97 @@ Code dependency analysis module for extracting file dependencies and relationshi
 import os
 import ast
 import json
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set, Any
+from typing import Dict, List, Set, Any, Callable, Optional, Tuple
 import logging
 
+try:
+    # RE2 scans with a DFA in linear time; the import pattern backtracks heavily under re
+    import re2
+except ImportError:
+    import re as re2
+
+from utils.hashing import text_hash
+
 logger = logging.getLogger('github_repo_analyzer')
 
+# Threads for per-file read and analysis work; file IO releases the GIL
+ANALYSIS_WORKERS = os.cpu_count() or 4
+
+# ES6 imports (group 1) and require calls (group 2), matched in a single scan of the file.
+# Unbraced import clauses stop at the end of the statement, so an import can't run on
+# into a later statement and swallow the require calls in between.
+_JS_IMPORT_RE = re2.compile(
+    r'import\s+(?:{[^}]*}|[^{;\n]*)\s+from\s+[\'"]([^\'"]+)[\'"]'
+    r'|require\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)'
+)
+
+# Directories never descended into, in addition to hidden ones (.git, .venv, .env etc.)
+SKIP_DIRS = frozenset({'__pycache__', 'node_modules', 'venv', 'env'})
+
+# File in the cache directory holding parsed Python modules, keyed by content hash
+AST_CACHE_FILE = "ast_cache.pkl"
+
+# Bumped whenever the cached module info changes shape, so older caches are discarded
+AST_CACHE_VERSION = 2
+
+class _PythonModuleVisitor(ast.NodeVisitor):
+    """
+    Collect the imports and top-level definitions of a module in one pass.
+    
+    Imports are statements, so only nested statement bodies are descended into;
+    expression subtrees are never visited.
+    """
+    # Fields of statement nodes (and except handlers / match cases) holding nested statements
+    BODY_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+    
+    def __init__(self):
+        self.imports = []  # Import and ImportFrom nodes in source order
+        self.definitions = []  # Top-level FunctionDef and ClassDef nodes
+    
+    def visit_Module(self, node):
+        for child in node.body:
+            if isinstance(child, (ast.FunctionDef, ast.ClassDef)):
+                self.definitions.append(child)
+            self.visit(child)
+    
+    def visit_Import(self, node):
+        self.imports.append(node)
+    
+    visit_ImportFrom = visit_Import
+    
+    def generic_visit(self, node):
+        for field in self.BODY_FIELDS:
+            for child in getattr(node, field, ()):
+                self.visit(child)
+
 class DependencyAnalyzer:
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, cache_dir: str = None, file_hashes: Dict[str, str] = None):
         """
         Initialize the dependency analyzer.
         
         Args:
             repo_path: Path to the repository root
+            cache_dir: Directory for the parsed Python module cache, or None to disable it
+            file_hashes: Optional content hashes of files already read this run, by relative
+                path; Python files whose hash is in the cache are analyzed without reading them
         """
         self.repo_path = Path(repo_path)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.file_hashes = {
+            path.replace('\\', '/'): file_hash for path, file_hash in (file_hashes or {}).items()
+        }
         self.dependencies = {}
         self.imports = {}
         self.modules = {}
         self.file_sizes = {}
+        self._all_paths: Set[str] = set()  # Repository-relative paths of all files
+        self._py_files: List[str] = []
+        self._js_files: List[str] = []
+        self._ast_cache = {}
+        self._used_ast_cache = {}
     
     def analyze_dependencies(self) -> Dict[str, Any]:
         """
@@ -33,11 +105,13 @@ class DependencyAnalyzer:
         """
         logger.info(f"Analyzing dependencies of repository at {self.repo_path}")
         
-        # Get file sizes
-        self._get_file_sizes()
+        # Get file sizes and the files to analyze
+        self._scan_repo()
         
         # Process Python files to extract imports and dependencies
+        self._load_ast_cache()
         self._process_python_files()
+        self._save_ast_cache()
         
         # Process JavaScript files
         self._process_javascript_files()
@@ -54,182 +128,332 @@ class DependencyAnalyzer:
             "file_tree": file_tree
         }
     
-    def _get_file_sizes(self):
-        """Get the size of all files in the repository."""
-        logger.info("Getting file sizes")
-        
-        for root, _, files in os.walk(self.repo_path):
-            # Skip hidden directories and common exclude directories
-            if any(part.startswith('.') for part in Path(root).parts) or \
-               any(part in ['__pycache__', 'node_modules', 'venv', '.git'] for part in Path(root).parts):
+    def _scan_repo(self):
+        """
+        Walk the repository once, collecting file sizes and the Python and JavaScript files.
+        
+        Sizes come from the directory entries, which saves a separate stat call per file
+        on Windows where the entry already carries them.
+        """
+        logger.info("Scanning repository files")
+        
+        stack = [(str(self.repo_path), '')]
+        while stack:
+            dir_path, rel_dir = stack.pop()
+            try:
+                with os.scandir(dir_path) as entries:
+                    subdirs = []
+                    for entry in entries:
+                        name = entry.name
+                        rel_path = f"{rel_dir}/{name}" if rel_dir else name
+                        
+                        if entry.is_dir(follow_symlinks=False):
+                            # Skip hidden directories and common exclude directories
+                            if not name.startswith('.') and name not in SKIP_DIRS:
+                                subdirs.append((entry.path, rel_path))
+                            continue
+                        
+                        try:
+                            if not entry.is_file():
+                                continue
+                            self.file_sizes[rel_path] = entry.stat().st_size
+                        except OSError as e:
+                            logger.error(f"Error getting size of {entry.path}: {e}")
+                            continue
+                        
+                        if name.endswith('.py'):
+                            self._py_files.append(entry.path)
+                        elif name.endswith('.js'):
+                            self._js_files.append(entry.path)
+            except OSError as e:
+                logger.error(f"Error scanning directory {dir_path}: {e}")
                 continue
-                
-            for file in files:
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, self.repo_path)
-                rel_path = rel_path.replace('\\', '/')  # Normalize path separators
-                
-                try:
-                    self.file_sizes[rel_path] = os.path.getsize(file_path)
-                except Exception as e:
-                    logger.error(f"Error getting size of {file_path}: {e}")
+            
+            # Visit subdirectories depth-first in listing order, like os.walk
+            stack.extend(reversed(subdirs))
+        
+        # Module resolution tests membership in this set instead of probing the filesystem
+        self._all_paths = set(self.file_sizes)
     
     def _process_python_files(self):
         """Process Python files to extract imports and dependencies."""
         logger.info("Processing Python files for dependencies")
         
-        python_files = self._find_files('.py')
-        
-        for file_path in python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                rel_path = os.path.relpath(file_path, self.repo_path)
-                rel_path = rel_path.replace('\\', '/')  # Normalize path separators
-                
-                self._analyze_python_file(rel_path, content)
-            
-            except Exception as e:
-                logger.error(f"Error processing file {file_path}: {e}")
+        for file_path, result in self._process_files(
+            self._py_files, self._analyze_python_file, self._analyze_cached_python_file
+        ):
+            self.imports[file_path] = result["imports"]
+            self.dependencies[file_path] = result["dependencies"]
+            self.modules[file_path] = result["module"]
     
     def _process_javascript_files(self):
         """Process JavaScript files to extract imports and dependencies."""
         logger.info("Processing JavaScript files for dependencies")
         
-        js_files = self._find_files('.js')
+        for file_path, result in self._process_files(self._js_files, self._analyze_javascript_file):
+            self.imports[file_path] = result["imports"]
+            self.dependencies[file_path] = result["dependencies"]
+    
+    def _process_files(
+        self, 
+        file_paths: List[str], 
+        analyze: Callable[[str, str], Optional[Dict[str, Any]]],
+        analyze_cached: Callable[[str], Optional[Dict[str, Any]]] = None
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Read and analyze files on a thread pool.
         
-        for file_path in js_files:
+        Args:
+            file_paths: Full paths of the files to process
+            analyze: Function taking (relative path, content) and returning the analysis or None
+            analyze_cached: Optional function taking a relative path and returning the analysis
+                without reading the file, or None if the file has to be read
+            
+        Returns:
+            List of (relative path, analysis) tuples in file order, for files analyzed successfully
+        """
+        def process(file_path):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
                 rel_path = os.path.relpath(file_path, self.repo_path)
                 rel_path = rel_path.replace('\\', '/')  # Normalize path separators
                 
-                self._analyze_javascript_file(rel_path, content)
+                if analyze_cached is not None:
+                    result = analyze_cached(rel_path)
+                    if result is not None:
+                        return rel_path, result
+                
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                
+                return rel_path, analyze(rel_path, content)
             
             except Exception as e:
                 logger.error(f"Error processing file {file_path}: {e}")
-    
-    def _find_files(self, extension: str) -> List[str]:
-        """Find all files with the given extension in the repository."""
-        matching_files = []
-        
-        for root, dirs, files in os.walk(self.repo_path):
-            # Skip hidden directories and common exclude directories
-            dirs[:] = [d for d in dirs if not d.startswith('.') and 
-                       d not in {'__pycache__', 'venv', 'env', '.venv', '.env', 'node_modules', '.git'}]
-            
-            for file in files:
-                if file.endswith(extension):
-                    matching_files.append(os.path.join(root, file))
+                return None, None
         
-        return matching_files
+        with ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS) as executor:
+            results = list(executor.map(process, file_paths))
+        
+        # Results are merged by the caller in file order, so the output doesn't depend on scheduling
+        return [(rel_path, result) for rel_path, result in results if result is not None]
     
-    def _analyze_python_file(self, file_path: str, content: str):
+    def _analyze_python_file(self, file_path: str, content: str) -> Optional[Dict[str, Any]]:
         """
         Analyze a Python file to extract imports and dependencies.
         
         Args:
             file_path: Relative path to the file
             content: File content
+            
+        Returns:
+            Dictionary with the file's imports, dependencies and module info, or None on error
         """
         try:
-            tree = ast.parse(content)
-            
-            # Initialize imports and dependencies
-            self.imports[file_path] = []
-            self.dependencies[file_path] = []
+            # Reuse the parse of an identical file from a previous run
+            key = text_hash(content)
+            parsed = self._ast_cache.get(key)
+            if parsed is None:
+                parsed = self._parse_python_module(content)
             
-            # Initialize module info
-            module_info = {
-                "imports": [],
-                "functions": [],
-                "classes": [],
-                "variables": []
-            }
+            return self._analyze_python_parse(file_path, key, parsed)
             
-            # Process imports
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for name in node.names:
-                        self.imports[file_path].append(name.name)
-                        module_info["imports"].append({
-                            "type": "import",
-                            "name": name.name,
-                            "alias": name.asname
-                        })
-                        
-                        # Add external dependency
-                        if not self._is_local_module(name.name):
-                            external_path = f"external/{name.name}"
-                            self.dependencies[file_path].append(external_path)
-                        
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module or ''
-                    for name in node.names:
-                        import_name = f"{module}.{name.name}" if module else name.name
-                        self.imports[file_path].append(import_name)
-                        module_info["imports"].append({
-                            "type": "from",
-                            "module": module,
-                            "name": name.name,
-                            "alias": name.asname
-                        })
-                        
-                        # Add external dependency if not a relative import
-                        if not module.startswith('.') and not self._is_local_module(module):
-                            external_path = f"external/{module}"
-                            self.dependencies[file_path].append(external_path)
+        except SyntaxError as e:
+            logger.error(f"Syntax error in {file_path}: {e}")
+        except Exception as e:
+            logger.error(f"Error analyzing {file_path}: {e}")
+        return None
+    
+    def _analyze_cached_python_file(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Analyze a Python file from the AST cache, using the hash of its content from this run.
+        
+        Args:
+            file_path: Relative path to the file
             
-            # Process functions
-            for node in ast.iter_child_nodes(tree):
-                if isinstance(node, ast.FunctionDef):
-                    function_info = {
-                        "name": node.name,
-                        "docstring": ast.get_docstring(node),
-                        "args": [arg.arg for arg in node.args.args],
-                        "decorators": [self._get_decorator_name(d) for d in node.decorator_list]
-                    }
-                    module_info["functions"].append(function_info)
-                
-                elif isinstance(node, ast.ClassDef):
-                    # Get base classes
-                    bases = []
-                    for base in node.bases:
-                        if isinstance(base, ast.Name):
-                            bases.append(base.id)
-                        elif isinstance(base, ast.Attribute):
-                            bases.append(f"{self._get_attribute_name(base)}")
-                    
-                    # Get class methods
-                    methods = []
-                    for child in ast.iter_child_nodes(node):
-                        if isinstance(child, ast.FunctionDef):
-                            methods.append(child.name)
-                    
-                    class_info = {
-                        "name": node.name,
-                        "docstring": ast.get_docstring(node),
-                        "bases": bases,
-                        "methods": methods,
-                        "decorators": [self._get_decorator_name(d) for d in node.decorator_list]
-                    }
-                    module_info["classes"].append(class_info)
+        Returns:
+            Dictionary with the file's imports, dependencies and module info, or None if the
+            file's hash isn't known or its parse isn't cached
+        """
+        key = self.file_hashes.get(file_path)
+        parsed = self._ast_cache.get(key) if key is not None else None
+        if parsed is None:
+            return None
+        return self._analyze_python_parse(file_path, key, parsed)
+    
+    def _analyze_python_parse(self, file_path: str, key: str, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Resolve the dependencies of a parsed Python file and keep its parse in the AST cache.
+        
+        Args:
+            file_path: Relative path to the file
+            key: Content hash the parse is cached under
+            parsed: Result of _parse_python_module for the file's content
             
-            # Store module info
-            self.modules[file_path] = module_info
+        Returns:
+            Dictionary with the file's imports, dependencies and module info
+        """
+        self._used_ast_cache[key] = parsed
+        
+        imports = parsed["imports"]
+        module_info = parsed["module"]
+        
+        # Add external dependencies; whether a module is local depends on the repository,
+        # so this isn't cached with the parse
+        dependencies = []
+        for import_info in module_info["imports"]:
+            if import_info["type"] == "import":
+                if not self._is_local_module(import_info["name"]):
+                    external_path = f"external/{import_info['name']}"
+                    dependencies.append(external_path)
+            else:
+                # Add external dependency if not a relative import
+                module = import_info["module"]
+                if not module.startswith('.') and not self._is_local_module(module):
+                    external_path = f"external/{module}"
+                    dependencies.append(external_path)
+        
+        # Find dependencies within the project
+        dependencies.extend(self._find_python_dependencies(file_path, imports))
+        
+        return {
+            "imports": imports,
+            "dependencies": dependencies,
+            "module": module_info
+        }
+    
+    def _parse_python_module(self, content: str) -> Dict[str, Any]:
+        """
+        Parse Python source into its imported names and module info.
+        
+        The result depends only on the content, so it can be cached by content hash.
+        
+        Args:
+            content: File content
             
-            # Find dependencies within the project
-            self._find_python_dependencies(file_path)
+        Returns:
+            Dictionary with the imported names and the module info
+        """
+        tree = ast.parse(content)
+        
+        # Collect imports and top-level definitions in a single pass over the statements
+        visitor = _PythonModuleVisitor()
+        visitor.visit(tree)
+        
+        # Initialize imports
+        imports = []
+        
+        # Initialize module info
+        module_info = {
+            "imports": [],
+            "functions": [],
+            "classes": [],
+            "variables": []
+        }
+        
+        # Process imports
+        for node in visitor.imports:
+            if isinstance(node, ast.Import):
+                for name in node.names:
+                    imports.append(name.name)
+                    module_info["imports"].append({
+                        "type": "import",
+                        "name": name.name,
+                        "alias": name.asname
+                    })
+                    
+            else:
+                module = node.module or ''
+                for name in node.names:
+                    import_name = f"{module}.{name.name}" if module else name.name
+                    imports.append(import_name)
+                    module_info["imports"].append({
+                        "type": "from",
+                        "module": module,
+                        "name": name.name,
+                        "alias": name.asname
+                    })
+        
+        # Process functions
+        for node in visitor.definitions:
+            if isinstance(node, ast.FunctionDef):
+                function_info = {
+                    "name": node.name,
+                    "start_line": self._get_start_line(node),
+                    "end_line": node.end_lineno,
+                    "docstring": ast.get_docstring(node),
+                    "args": [arg.arg for arg in node.args.args],
+                    "decorators": [self._get_decorator_name(d) for d in node.decorator_list]
+                }
+                module_info["functions"].append(function_info)
             
-        except SyntaxError as e:
-            logger.error(f"Syntax error in {file_path}: {e}")
+            elif isinstance(node, ast.ClassDef):
+                # Get base classes
+                bases = []
+                for base in node.bases:
+                    if isinstance(base, ast.Name):
+                        bases.append(base.id)
+                    elif isinstance(base, ast.Attribute):
+                        bases.append(f"{self._get_attribute_name(base)}")
+                
+                # Get class methods
+                methods = []
+                for child in ast.iter_child_nodes(node):
+                    if isinstance(child, ast.FunctionDef):
+                        methods.append(child.name)
+                
+                class_info = {
+                    "name": node.name,
+                    "start_line": self._get_start_line(node),
+                    "end_line": node.end_lineno,
+                    "docstring": ast.get_docstring(node),
+                    "bases": bases,
+                    "methods": methods,
+                    "decorators": [self._get_decorator_name(d) for d in node.decorator_list]
+                }
+                module_info["classes"].append(class_info)
+        
+        return {"imports": imports, "module": module_info}
+    
+    def _load_ast_cache(self):
+        """Load the cache of parsed Python modules from the previous run."""
+        self._ast_cache = {}
+        self._used_ast_cache = {}
+        if self.cache_dir is None:
+            return
+        
+        cache_path = self.cache_dir / AST_CACHE_FILE
+        if not cache_path.exists():
+            return
+        
+        try:
+            with open(cache_path, 'rb') as f:
+                saved = pickle.load(f)
+            if not isinstance(saved, tuple) or saved[0] != AST_CACHE_VERSION:
+                logger.info("Ignoring AST cache from an older version")
+                return
+            self._ast_cache = saved[1]
+            logger.info(f"Loaded {len(self._ast_cache)} cached Python module parses")
         except Exception as e:
-            logger.error(f"Error analyzing {file_path}: {e}")
+            logger.error(f"Error loading AST cache: {e}")
+            self._ast_cache = {}
     
-    def _analyze_javascript_file(self, file_path: str, content: str):
+    def _save_ast_cache(self):
+        """Save the parses used in this run, dropping entries for content that no longer exists."""
+        if self.cache_dir is None:
+            return
+        
+        cache_path = self.cache_dir / AST_CACHE_FILE
+        temp_path = cache_path.with_suffix('.tmp')
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                pickle.dump((AST_CACHE_VERSION, self._used_ast_cache), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+            logger.info(f"Saved {len(self._used_ast_cache)} Python module parses to the AST cache")
+        except Exception as e:
+            logger.error(f"Error saving AST cache: {e}")
+    
+    def _analyze_javascript_file(self, file_path: str, content: str) -> Optional[Dict[str, Any]]:
         """
         Analyze a JavaScript file to extract imports and dependencies.
         This is a simple regex-based approach for basic import/require statements.
@@ -237,41 +461,44 @@ class DependencyAnalyzer:
         Args:
             file_path: Relative path to the file
             content: File content
+            
+        Returns:
+            Dictionary with the file's imports and dependencies, or None on error
         """
         try:
-            import re
-            
             # Initialize imports and dependencies
-            self.imports[file_path] = []
-            self.dependencies[file_path] = []
-            
-            # Look for ES6 imports
-            import_regex = r'import\s+(?:{[^}]*}|[^{]*)\s+from\s+[\'"]([^\'"]+)[\'"]'
-            imports = re.findall(import_regex, content)
+            file_imports = []
+            dependencies = []
             
-            # Look for require statements
-            require_regex = r'require\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)'
-            requires = re.findall(require_regex, content)
-            
-            # Combine all imports
-            all_imports = imports + requires
+            # Look for ES6 imports and require statements, in source order
+            all_imports = [
+                es6_import or required
+                for es6_import, required in _JS_IMPORT_RE.findall(content)
+            ]
             
             for imp in all_imports:
-                self.imports[file_path].append(imp)
+                file_imports.append(imp)
                 
                 # Determine if local or external
                 if imp.startswith('.') or imp.startswith('/'):
                     # Local import - try to resolve the path
                     resolved_path = self._resolve_js_import_path(file_path, imp)
                     if resolved_path:
-                        self.dependencies[file_path].append(resolved_path)
+                        dependencies.append(resolved_path)
                 else:
                     # External import
                     external_path = f"external/{imp}"
-                    self.dependencies[file_path].append(external_path)
+                    dependencies.append(external_path)
+            
+            return {"imports": file_imports, "dependencies": dependencies}
             
         except Exception as e:
             logger.error(f"Error analyzing JavaScript file {file_path}: {e}")
+        return None
+    
+    def _get_start_line(self, node) -> int:
+        """Get the first line of a function or class definition, including its decorators."""
+        return min([node.lineno] + [d.lineno for d in node.decorator_list])
     
     def _get_decorator_name(self, decorator) -> str:
         """Extract decorator name from AST node."""
@@ -296,27 +523,27 @@ class DependencyAnalyzer:
     
     def _is_local_module(self, module_name: str) -> bool:
         """Check if a module name might refer to a local module."""
-        parts = module_name.split('.')
+        potential_path = module_name.replace('.', '/')
         
         # Check if this might be a local module
-        potential_path = os.path.join(self.repo_path, *parts)
-        
-        return (os.path.exists(f"{potential_path}.py") or 
-                os.path.exists(os.path.join(potential_path, "__init__.py")))
+        init_path = f"{potential_path}/__init__.py" if potential_path else "__init__.py"
+        return f"{potential_path}.py" in self._all_paths or init_path in self._all_paths
     
-    def _find_python_dependencies(self, file_path: str):
+    def _find_python_dependencies(self, file_path: str, imports: List[str]) -> List[str]:
         """
         Find dependencies of a Python file based on imports.
         
         Args:
             file_path: Relative path to the file
+            imports: Names imported by the file
+            
+        Returns:
+            Paths of the project files the file depends on
         """
-        if file_path not in self.imports:
-            return
-        
+        dependencies = []
         file_dir = os.path.dirname(file_path)
         
-        for imp in self.imports[file_path]:
+        for imp in imports:
             # Handle relative imports
             if imp.startswith('.'):
                 parts = imp.lstrip('.').split('.')
@@ -332,10 +559,10 @@ class DependencyAnalyzer:
                     potential_path = os.path.join(parent_dir, *parts)
                     potential_path = potential_path.replace('\\', '/')  # Normalize path separators
                     
-                    if os.path.exists(os.path.join(self.repo_path, f"{potential_path}.py")):
-                        self.dependencies[file_path].append(f"{potential_path}.py")
-                    elif os.path.exists(os.path.join(self.repo_path, potential_path, "__init__.py")):
-                        self.dependencies[file_path].append(os.path.join(potential_path, "__init__.py").replace('\\', '/'))
+                    if f"{potential_path}.py" in self._all_paths:
+                        dependencies.append(f"{potential_path}.py")
+                    elif f"{potential_path}/__init__.py" in self._all_paths:
+                        dependencies.append(f"{potential_path}/__init__.py")
             
             # Handle absolute imports within the project
             else:
@@ -345,10 +572,12 @@ class DependencyAnalyzer:
                 potential_path = os.path.join(*parts)
                 potential_path = potential_path.replace('\\', '/')  # Normalize path separators
                 
-                if os.path.exists(os.path.join(self.repo_path, f"{potential_path}.py")):
-                    self.dependencies[file_path].append(f"{potential_path}.py")
-                elif os.path.exists(os.path.join(self.repo_path, potential_path, "__init__.py")):
-                    self.dependencies[file_path].append(os.path.join(potential_path, "__init__.py").replace('\\', '/'))
+                if f"{potential_path}.py" in self._all_paths:
+                    dependencies.append(f"{potential_path}.py")
+                elif f"{potential_path}/__init__.py" in self._all_paths:
+                    dependencies.append(f"{potential_path}/__init__.py")
+        
+        return dependencies
     
     def _resolve_js_import_path(self, file_path: str, import_path: str) -> str:
         """
@@ -390,15 +619,17 @@ class DependencyAnalyzer:
         
         return None
 
-def analyze_dependencies(repo_path: str) -> Dict[str, Any]:
+def analyze_dependencies(repo_path: str, cache_dir: str = None, file_hashes: Dict[str, str] = None) -> Dict[str, Any]:
     """
     Analyze the dependencies of a repository.
     
     Args:
         repo_path: Path to the repository
+        cache_dir: Directory for the parsed Python module cache, or None to disable it
+        file_hashes: Optional content hashes of files already read this run, by relative path
         
     Returns:
         Dictionary containing dependency information
     """
-    analyzer = DependencyAnalyzer(repo_path)
+    analyzer = DependencyAnalyzer(repo_path, cache_dir, file_hashes)
     return analyzer.analyze_dependencies()
\ No newline at end of file
@@ -5,14 +5,31 @@ import os
 import time
 import json
 import pickle
-import hashlib
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from typing import Dict, List, Set, Any, Tuple
 import logging
-import numpy as np
 from pathlib import Path
 
+from utils.hashing import content_hash, text_hash
+
 logger = logging.getLogger('github_repo_analyzer')
 
+# Threads used to hash file contents; the hash functions release the GIL on large inputs
+HASH_WORKERS = os.cpu_count() or 4
+
+# Record header in the file hash manifest: path length and the 16-byte digest, followed by
+# the UTF-8 path itself
+_HASH_RECORD = struct.Struct("<H16s")
+
+def _hash_file_content(file: Dict[str, Any]) -> str:
+    """Hash the content of a code file, reusing the hash computed when it was read."""
+    if 'hash' in file:
+        return file['hash']
+    content = file['content']
+    return content_hash(content) if isinstance(content, bytes) else text_hash(content)
+
 class IncrementalIndexer:
     def __init__(self, repo_path: str, index_dir: str):
         """
@@ -24,8 +41,11 @@ class IncrementalIndexer:
         """
         self.repo_path = Path(repo_path)
         self.index_dir = Path(index_dir)
-        self.file_hashes_path = self.index_dir / "file_hashes.json"
+        self.file_hashes_path = self.index_dir / "file_hashes.bin"
+        self.legacy_file_hashes_path = self.index_dir / "file_hashes.json"
+        self.reverse_deps_path = self.index_dir / "reverse_deps.pkl"
         self.file_hashes = {}
+        self.reverse_deps: Dict[str, Set[str]] = {}  # File -> files that depend on it
         self.changed_files = set()
         self.new_files = set()
         self.deleted_files = set()
@@ -38,12 +58,109 @@ class IncrementalIndexer:
         # Load existing file hashes if available
         if os.path.exists(self.file_hashes_path):
             try:
-                with open(self.file_hashes_path, 'r') as f:
+                with open(self.file_hashes_path, 'rb') as f:
+                    self.file_hashes = self._unpack_file_hashes(f.read())
+                logger.info(f"Loaded hashes for {len(self.file_hashes)} files")
+            except Exception as e:
+                logger.error(f"Error loading file hashes: {e}")
+                self.file_hashes = {}
+        elif os.path.exists(self.legacy_file_hashes_path):
+            # Hashes saved as JSON by earlier versions; replaced by the binary file on the next save
+            try:
+                with open(self.legacy_file_hashes_path, 'r') as f:
                     self.file_hashes = json.load(f)
                 logger.info(f"Loaded hashes for {len(self.file_hashes)} files")
             except Exception as e:
                 logger.error(f"Error loading file hashes: {e}")
                 self.file_hashes = {}
+        
+        # Load the dependents recorded by the last dependency analysis
+        if os.path.exists(self.reverse_deps_path):
+            try:
+                with open(self.reverse_deps_path, 'rb') as f:
+                    self.reverse_deps = pickle.load(f)
+                logger.info(f"Loaded dependents for {len(self.reverse_deps)} files")
+            except Exception as e:
+                logger.error(f"Error loading reverse dependencies: {e}")
+                self.reverse_deps = {}
+    
+    def save_dependencies(self, dependencies: Dict[str, List[str]]):
+        """
+        Record which files depend on each file, for invalidating dependents on the next update.
+        
+        Args:
+            dependencies: Dependencies of each file, as produced by the dependency analyzer
+        """
+        reverse_deps = {}
+        for file_path, file_deps in dependencies.items():
+            for dep in file_deps:
+                if not dep.startswith('external/'):
+                    reverse_deps.setdefault(dep, set()).add(file_path)
+        self.reverse_deps = reverse_deps
+        
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            temp_path = self.reverse_deps_path.with_suffix('.tmp')
+            with open(temp_path, 'wb') as f:
+                pickle.dump(reverse_deps, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.reverse_deps_path)
+            logger.info(f"Saved dependents for {len(reverse_deps)} files")
+        except Exception as e:
+            logger.error(f"Error saving reverse dependencies: {e}")
+    
+    def _add_dependents(self, current_files: Dict[str, str]):
+        """
+        Mark files that transitively depend on a changed, new or deleted file as changed.
+        
+        Args:
+            current_files: Hashes of the files currently in the repository
+        """
+        if not self.reverse_deps:
+            return
+        
+        # Dependency paths always use '/', code file paths use the OS separator
+        current_by_dep_path = {file_path.replace('\\', '/'): file_path for file_path in current_files}
+        
+        queue = [
+            file_path.replace('\\', '/')
+            for file_path in self.changed_files | self.new_files | self.deleted_files
+        ]
+        seen = set(queue)
+        while queue:
+            for dependent in self.reverse_deps.get(queue.pop(), ()):
+                if dependent in seen:
+                    continue
+                seen.add(dependent)
+                queue.append(dependent)
+                
+                file_path = current_by_dep_path.get(dependent)
+                if file_path is not None and file_path not in self.new_files and file_path not in self.changed_files:
+                    self.changed_files.add(file_path)
+                    logger.debug(f"Dependent of a changed file: {file_path}")
+    
+    @staticmethod
+    def _pack_file_hashes(file_hashes: Dict[str, str]) -> bytes:
+        """Pack file hashes into fixed-header binary records."""
+        records = []
+        for file_path, file_hash in file_hashes.items():
+            path_bytes = file_path.encode('utf-8', 'surrogatepass')
+            records.append(_HASH_RECORD.pack(len(path_bytes), bytes.fromhex(file_hash)))
+            records.append(path_bytes)
+        return b"".join(records)
+    
+    @staticmethod
+    def _unpack_file_hashes(data: bytes) -> Dict[str, str]:
+        """Unpack file hashes packed by _pack_file_hashes."""
+        file_hashes = {}
+        view = memoryview(data)
+        offset = 0
+        while offset < len(view):
+            path_len, digest = _HASH_RECORD.unpack_from(view, offset)
+            offset += _HASH_RECORD.size
+            file_path = bytes(view[offset:offset + path_len]).decode('utf-8', 'surrogatepass')
+            offset += path_len
+            file_hashes[file_path] = digest.hex()
+        return file_hashes
     
     def detect_changes(self, code_files: List[Dict[str, Any]]) -> Tuple[Set[str], Set[str], Set[str]]:
         """
@@ -60,19 +177,18 @@ class IncrementalIndexer:
         current_files = {}
         
         # Calculate hashes for current files
-        for file in code_files:
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+            file_hashes = list(executor.map(_hash_file_content, code_files))
+        
+        for file, file_hash in zip(code_files, file_hashes):
             file_path = file['path']
-            content = file['content']
-            
-            # Calculate hash of content
-            content_hash = hashlib.md5(content.encode()).hexdigest()
-            current_files[file_path] = content_hash
+            current_files[file_path] = file_hash
             
             # Check if file is new or changed
             if file_path not in self.file_hashes:
                 self.new_files.add(file_path)
                 logger.debug(f"New file: {file_path}")
-            elif self.file_hashes[file_path] != content_hash:
+            elif self.file_hashes[file_path] != file_hash:
                 self.changed_files.add(file_path)
                 logger.debug(f"Changed file: {file_path}")
         
@@ -82,13 +198,20 @@ class IncrementalIndexer:
                 self.deleted_files.add(file_path)
                 logger.debug(f"Deleted file: {file_path}")
         
+        # Re-index files whose dependencies changed
+        self._add_dependents(current_files)
+        
         # Update file hashes
         self.file_hashes = current_files
         
         # Save updated file hashes
         try:
-            with open(self.file_hashes_path, 'w') as f:
-                json.dump(self.file_hashes, f)
+            temp_path = self.file_hashes_path.with_suffix('.tmp')
+            with open(temp_path, 'wb') as f:
+                f.write(self._pack_file_hashes(self.file_hashes))
+            os.replace(temp_path, self.file_hashes_path)
+            if os.path.exists(self.legacy_file_hashes_path):
+                os.remove(self.legacy_file_hashes_path)
             logger.info(f"Saved hashes for {len(self.file_hashes)} files")
         except Exception as e:
             logger.error(f"Error saving file hashes: {e}")
@@ -160,69 +283,27 @@ class IncrementalIndexer:
                 logger.info("No existing index found, creating new index")
                 return False  # No existing index, need to create a new one
             
-            # Parse files
+            # Parse files, peeking at the first chunk so the vectorizer is only used when needed
             parsed_files = code_parser.parse_files(files_to_process)
-            logger.info(f"Parsed {len(parsed_files)} chunks from {len(files_to_process)} files")
+            first_chunk = next(parsed_files, None)
             
             # If we have files to add or update
-            if parsed_files:
+            if first_chunk is not None:
                 # Vectorize files
-                vectors = vectorizer.vectorize_code(parsed_files)
-                
-                # Get existing vectors and metadata
-                existing_embeddings = faiss_index.index.reconstruct_batch(range(faiss_index.index.ntotal))
-                existing_metadata = faiss_index.metadata
+                vectors = vectorizer.vectorize_code(chain([first_chunk], parsed_files))
+                logger.info(f"Parsed {len(vectors['metadata'])} chunks from {len(files_to_process)} files")
                 
-                # Filter out deleted and changed files from existing data
+                # Replace the entries of changed and deleted files in place
                 files_to_remove = changed_files.union(deleted_files)
-                indices_to_keep = [
-                    i for i, meta in enumerate(existing_metadata)
-                    if meta['path'] not in files_to_remove
-                ]
+                faiss_index.update(files_to_remove, vectors['embeddings'], vectors['metadata'])
                 
-                # Create new index with filtered data plus new data
-                if indices_to_keep:
-                    filtered_embeddings = existing_embeddings[indices_to_keep]
-                    filtered_metadata = [existing_metadata[i] for i in indices_to_keep]
-                    
-                    # Combine with new data
-                    combined_embeddings = np.vstack([filtered_embeddings, vectors['embeddings']])
-                    combined_metadata = filtered_metadata + vectors['metadata']
-                else:
-                    # If all existing data is being replaced
-                    combined_embeddings = vectors['embeddings']
-                    combined_metadata = vectors['metadata']
-                
-                # Create new index
-                faiss_index.create_index({
-                    'embeddings': combined_embeddings,
-                    'metadata': combined_metadata
-                }, combined_metadata)
-                
-                logger.info(f"Updated index with {len(parsed_files)} new chunks, total chunks: {faiss_index.index.ntotal}")
+                logger.info(f"Updated index with {len(vectors['metadata'])} new chunks, total chunks: {faiss_index.index.ntotal}")
                 return True
             
             # If we only have deleted files
             elif deleted_files:
-                # Get existing vectors and metadata
-                existing_embeddings = faiss_index.index.reconstruct_batch(range(faiss_index.index.ntotal))
-                existing_metadata = faiss_index.metadata
-                
-                # Filter out deleted files from existing data
-                indices_to_keep = [
-                    i for i, meta in enumerate(existing_metadata)
-                    if meta['path'] not in deleted_files
-                ]
-                
-                # Create new index with filtered data
-                filtered_embeddings = existing_embeddings[indices_to_keep]
-                filtered_metadata = [existing_metadata[i] for i in indices_to_keep]
-                
-                # Create new index
-                faiss_index.create_index({
-                    'embeddings': filtered_embeddings,
-                    'metadata': filtered_metadata
-                }, filtered_metadata)
+                # Remove the entries of deleted files in place
+                faiss_index.update(deleted_files)
                 
                 logger.info(f"Updated index by removing {len(deleted_files)} deleted files, total chunks: {faiss_index.index.ntotal}")
                 return True
@@ -1,35 +1,86 @@
 """
 Code parsing module.
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+# Number of lines per chunk
+CHUNK_SIZE = 50
+
+# Number of overlapping lines between chunks
+CHUNK_OVERLAP = 10
+
+# Language names reported in chunk metadata, by file extension
+EXTENSION_LANGUAGES = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.jsx': 'JavaScript/React',
+    '.ts': 'TypeScript',
+    '.tsx': 'TypeScript/React',
+    '.java': 'Java',
+    '.c': 'C',
+    '.cpp': 'C++',
+    '.h': 'C/C++ Header',
+    '.hpp': 'C++ Header',
+    '.cs': 'C#',
+    '.go': 'Go',
+    '.rb': 'Ruby',
+    '.php': 'PHP',
+    '.swift': 'Swift',
+    '.kt': 'Kotlin',
+    '.rs': 'Rust'
+}
+
+
+def _line_ends(content: str) -> List[int]:
+    """
+    Get the end offset of every line in content, excluding the newline.
+
+    Matches content.split('\n'): the last line ends at len(content).
+    """
+    ends = []
+    pos = content.find('\n')
+    while pos != -1:
+        ends.append(pos)
+        pos = content.find('\n', pos + 1)
+    ends.append(len(content))
+    return ends
 
 
 class CodeParser:
-    def __init__(self):
-        pass
+    def __init__(self, ast_info: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Initialize the code parser.
+        
+        Args:
+            ast_info: Optional map of '/'-separated Python file paths to their module info from
+                DependencyAnalyzer, used to chunk those files at function and class boundaries
+        """
+        self.ast_info = ast_info or {}
     
-    def parse_files(self, code_files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def parse_files(self, code_files: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
         """
         Parse code files into chunks suitable for embedding.
         
+        Chunks are yielded one file at a time, so the whole repository is never
+        held as a list of chunks before it is vectorized.
+        
         Args:
             code_files: List of dictionaries containing code file information
             
-        Returns:
-            List of parsed code chunks with metadata
+        Yields:
+            Parsed code chunks with metadata
         """
-        parsed_files = []
-        
         for file in code_files:
-            chunks = self._chunk_file(file)
-            parsed_files.extend(chunks)
-            
-        return parsed_files
+            yield from self._chunk_file(file)
     
     def _chunk_file(self, file: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Split a file into smaller chunks for better retrieval.
         
+        Python files with module info are split into one chunk per top-level function
+        or class, plus the code between them; everything else uses overlapping windows
+        of a fixed number of lines. Sections longer than a window are windowed too.
+        
         Args:
             file: Dictionary containing code file information
             
@@ -38,61 +89,81 @@ class CodeParser:
         """
         content = file['content']
         path = file['path']
+        language = self._get_language_from_extension(file['extension'])
         
-        # Split by function/class or by a fixed number of lines
-        lines = content.split('\n')
+        # Find line boundaries once and slice chunks straight out of content
+        line_ends = _line_ends(content)
+        num_lines = len(line_ends)
         chunks = []
         
-        # Simple chunking by fixed number of lines
-        chunk_size = 50  # Number of lines per chunk
-        overlap = 10     # Number of overlapping lines between chunks
+        # Module info is keyed by '/'-separated paths; file paths use os.sep
+        module_info = self.ast_info.get(path.replace('\\', '/')) if file['extension'] == '.py' else None
+        if module_info:
+            sections = self._get_definition_sections(module_info, num_lines)
+        else:
+            sections = [(1, num_lines)]
         
-        for i in range(0, len(lines), chunk_size - overlap):
-            chunk_lines = lines[i:i + chunk_size]
-            if not chunk_lines:
-                continue
+        for first_line, last_line in sections:
+            for i in range(first_line - 1, last_line, CHUNK_SIZE - CHUNK_OVERLAP):
+                end = min(i + CHUNK_SIZE, last_line)
+                start_offset = line_ends[i - 1] + 1 if i else 0
+                chunk_content = content[start_offset:line_ends[end - 1]]
                 
-            chunk_content = '\n'.join(chunk_lines)
+                # Skip empty chunks
+                if not chunk_content.strip():
+                    continue
+                
+                chunk = {
+                    'path': path,
+                    'content': chunk_content,
+                    'start_line': i + 1,
+                    'end_line': end,
+                    'metadata': {
+                        'file': path,
+                        'language': language
+                    }
+                }
+                
+                chunks.append(chunk)
+        
+        return chunks
+    
+    def _get_definition_sections(self, module_info: Dict[str, Any], num_lines: int) -> List[Tuple[int, int]]:
+        """
+        Split a Python file into line ranges at its top-level functions and classes.
+        
+        Args:
+            module_info: Module info of the file from DependencyAnalyzer
+            num_lines: Number of lines in the file
             
-            # Skip empty chunks
-            if not chunk_content.strip():
+        Returns:
+            List of inclusive (first line, last line) ranges covering the whole file
+        """
+        definitions = sorted(
+            (info['start_line'], min(info['end_line'], num_lines))
+            for info in module_info['functions'] + module_info['classes']
+            if 'start_line' in info
+        )
+        
+        sections = []
+        next_line = 1
+        for start_line, end_line in definitions:
+            # Ignore definitions that don't fit the content, e.g. if the file changed since analysis
+            if start_line < next_line or start_line > end_line:
                 continue
             
-            chunk = {
-                'path': path,
-                'content': chunk_content,
-                'start_line': i + 1,
-                'end_line': min(i + len(chunk_lines), len(lines)),
-                'metadata': {
-                    'file': path,
-                    'language': self._get_language_from_extension(file['extension'])
-                }
-            }
+            # Code between definitions, such as imports and module-level statements
+            if start_line > next_line:
+                sections.append((next_line, start_line - 1))
             
-            chunks.append(chunk)
+            sections.append((start_line, end_line))
+            next_line = end_line + 1
         
-        return chunks
+        if next_line <= num_lines:
+            sections.append((next_line, num_lines))
+        
+        return sections
     
     def _get_language_from_extension(self, ext: str) -> str:
         """Map file extension to language name."""
-        extension_map = {
-            '.py': 'Python',
-            '.js': 'JavaScript',
-            '.jsx': 'JavaScript/React',
-            '.ts': 'TypeScript',
-            '.tsx': 'TypeScript/React',
-            '.java': 'Java',
-            '.c': 'C',
-            '.cpp': 'C++',
-            '.h': 'C/C++ Header',
-            '.hpp': 'C++ Header',
-            '.cs': 'C#',
-            '.go': 'Go',
-            '.rb': 'Ruby',
-            '.php': 'PHP',
-            '.swift': 'Swift',
-            '.kt': 'Kotlin',
-            '.rs': 'Rust'
-        }
-        
-        return extension_map.get(ext, 'Unknown')
\ No newline at end of file
+        return EXTENSION_LANGUAGES.get(ext, 'Unknown')
\ No newline at end of file
@@ -1,7 +1,8 @@
 """
 Code vectorization module for embedding code chunks with GPU support.
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
+from itertools import islice
 import logging
 import threading
 import time
@@ -200,31 +201,51 @@ class CodeVectorizer:
             finally:
                 self.model_loading = False
         
-    def vectorize_code(self, code_chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def vectorize_code(self, code_chunks: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Convert code chunks to vector embeddings.
         
+        Chunks are consumed a batch at a time, so a generator such as
+        CodeParser.parse_files is embedded as it is produced.
+        
         Args:
-            code_chunks: List of code chunks to vectorize
+            code_chunks: Iterable of code chunks to vectorize
             
         Returns:
             Dictionary with embeddings and metadata
         """
-        logger.info(f"Vectorizing {len(code_chunks)} code chunks")
+        logger.info("Vectorizing code chunks")
         
         # Start vectorization operation
         operation_id = "code_vectorization"
         start_operation(operation_id, "Vectorizing code")
-        update_progress(operation_id, 0.1, f"Processing {len(code_chunks)} code chunks")
+        update_progress(operation_id, 0.1, "Processing code chunks")
         
         try:
-            texts = [chunk['content'] for chunk in code_chunks]
-            metadata = code_chunks
+            self._load_model()  # Ensure model is loaded
             
             # Get embeddings
             logger.info(f"Computing embeddings on {self.device}")
             update_progress(operation_id, 0.2, f"Computing embeddings on {'GPU' if self.gpu_available else 'CPU'}...")
-            embeddings = self._get_embeddings(texts, operation_id)
+            
+            batch_size = self._get_batch_size()
+            chunks = iter(code_chunks)
+            metadata = []
+            embeddings = []
+            
+            while True:
+                batch = list(islice(chunks, batch_size))
+                if not batch:
+                    break
+                
+                metadata.extend(batch)
+                embeddings.extend(self._embed_batch([chunk['content'] for chunk in batch]))
+                
+                batch_num = (len(metadata) - 1) // batch_size + 1
+                logger.info(f"Processed batch {batch_num} ({len(metadata)} chunks)")
+                update_progress(operation_id, 0.5, f"Embedded {len(metadata)} code chunks")
+            
+            embeddings = np.array(embeddings)
             logger.info(f"Embeddings computed, shape: {embeddings.shape}")
             
             update_progress(operation_id, 0.95, "Finalizing vectorization...")
@@ -280,9 +301,7 @@ class CodeVectorizer:
         
         embeddings = []
         
-        # Process in batches to avoid memory issues
-        # Use smaller batch size on CPU, larger on GPU
-        batch_size = 16 if self.gpu_available else 8
+        batch_size = self._get_batch_size()
         logger.info(f"Processing {len(texts)} texts in batches of {batch_size}")
         
         for i in range(0, len(texts), batch_size):
@@ -301,30 +320,48 @@ class CodeVectorizer:
                     f"Processing batch {batch_num}/{total_batches}"
                 )
             
-            # Tokenize and prepare inputs
-            inputs = self.tokenizer(
-                batch_texts,
-                padding=True,
-                truncation=True,
-                max_length=512,
-                return_tensors="pt"
-            ).to(self.device)
-            
-            # Get embeddings
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                
-            # Use mean pooling to get a single vector per text
-            attention_mask = inputs['attention_mask']
-            token_embeddings = outputs.last_hidden_state
+            embeddings.extend(self._embed_batch(batch_texts))
+        
+        logger.info(f"All embeddings computed, total: {len(embeddings)}")
+        return np.array(embeddings)
+    
+    def _get_batch_size(self) -> int:
+        """Get the embedding batch size for the current device."""
+        # Process in batches to avoid memory issues
+        # Use smaller batch size on CPU, larger on GPU
+        return 16 if self.gpu_available else 8
+    
+    def _embed_batch(self, batch_texts: List[str]) -> np.ndarray:
+        """
+        Get embeddings for a single batch of texts.
+        
+        Args:
+            batch_texts: Batch of text strings
             
-            # Mean pooling
-            input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
-            sum_embeddings = torch.sum(token_embeddings * input_mask_expanded, 1)
-            sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
-            batch_embeddings = (sum_embeddings / sum_mask).cpu().numpy()
+        Returns:
+            NumPy array with one embedding per text
+        """
+        # Tokenize and prepare inputs
+        inputs = self.tokenizer(
+            batch_texts,
+            padding=True,
+            truncation=True,
+            max_length=512,
+            return_tensors="pt"
+        ).to(self.device)
+        
+        # Get embeddings
+        with torch.no_grad():
+            outputs = self.model(**inputs)
             
-            embeddings.extend(batch_embeddings)
+        # Use mean pooling to get a single vector per text
+        attention_mask = inputs['attention_mask']
+        token_embeddings = outputs.last_hidden_state
         
-        logger.info(f"All embeddings computed, total: {len(embeddings)}")
-        return np.array(embeddings)
\ No newline at end of file
+        # Mean pooling
+        input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
+        sum_embeddings = torch.sum(token_embeddings * input_mask_expanded, 1)
+        sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
+        batch_embeddings = (sum_embeddings / sum_mask).cpu().numpy()
+        
+        return batch_embeddings
\ No newline at end of file
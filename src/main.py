@@ -64,7 +64,7 @@ except Exception as e:
     sys.exit(1)
 
 # Set the port for the application
-PORT = getattr(config, 'PORT', 5000)
+PORT = config.PORT
 
 repo_handler = None
 code_parser = None
@@ -254,7 +254,7 @@ def setup_system():
         # Initialize code generator
         update_progress("setup", 0.9, "Initializing code generator...")
         if code_generator is None:
-            code_generator = CodeGenerator(llm_generator)
+            code_generator = CodeGenerator(llm_generator, config.responses_dir)
         
         update_progress("setup", 0.95, "Finalizing setup...")
         complete_operation("setup", True, "System setup completed successfully")
@@ -308,10 +308,6 @@ def clone_repo():
         repo_path = repo_handler.clone()
         logger.info(f"Repository cloned successfully to {repo_path}")
         
-        # Initialize code parser
-        logger.info("Initializing code parser...")
-        code_parser = CodeParser()
-        
         # Initialize vectorizer if needed
         if vectorizer is None:
             logger.info(f"Initializing vectorizer with model {config.model_name}...")
@@ -324,15 +320,36 @@ def clone_repo():
         code_files = repo_handler.get_code_files()
         logger.info(f"Found {len(code_files)} code files")
         
+        # Analyze dependencies first; the module info lets the parser chunk Python files by definition
+        logger.info("Analyzing dependencies...")
+        update_progress("repo_processing", 0.42, "Analyzing dependencies...")
+        try:
+            file_hashes = {file['path']: file['hash'] for file in code_files}
+            dependency_data = analyze_dependencies(str(repo_path), config.index_dir, file_hashes)
+            logger.info("Dependency analysis complete")
+        except Exception as e:
+            logger.error(f"Error analyzing dependencies: {e}")
+            dependency_data = None
+        
+        # Initialize code parser
+        logger.info("Initializing code parser...")
+        code_parser = CodeParser(dependency_data["modules"] if dependency_data else None)
+        
+        # Initialize incremental indexer if not already initialized; full indexing runs need it
+        # too, to record the dependency graph for the first incremental update
+        if incremental_indexer is None:
+            logger.info("Initializing incremental indexer...")
+            update_progress("repo_processing", 0.45, "Setting up incremental indexing...")
+            incremental_indexer = IncrementalIndexer(str(repo_path), config.index_dir)
+            incremental_indexer.initialize()
+        
+        # Record the dependents in the current tree so an incremental update also re-indexes
+        # the files depending on changed ones
+        if dependency_data:
+            incremental_indexer.save_dependencies(dependency_data["dependencies"])
+        
         # Check if we should use incremental indexing
         if incremental and faiss_index is not None:
-            # Initialize incremental indexer if not already initialized
-            if incremental_indexer is None:
-                logger.info("Initializing incremental indexer...")
-                update_progress("repo_processing", 0.45, "Setting up incremental indexing...")
-                incremental_indexer = IncrementalIndexer(str(repo_path), config.index_dir)
-                incremental_indexer.initialize()
-            
             # Try incremental update
             logger.info("Attempting incremental index update...")
             update_progress("repo_processing", 0.5, "Performing incremental indexing...")
@@ -345,42 +362,32 @@ def clone_repo():
                 logger.info("Incremental update not possible, falling back to full indexing")
                 update_progress("repo_processing", 0.5, "Falling back to full indexing...")
                 
-                # Parse files
-                logger.info("Parsing files...")
-                update_progress("repo_processing", 0.55, f"Parsing {len(code_files)} code files...")
-                parsed_files = code_parser.parse_files(code_files)
-                logger.info(f"Parsed into {len(parsed_files)} chunks")
-                
-                # Vectorize and create FAISS index
-                logger.info("Vectorizing code chunks...")
-                update_progress("repo_processing", 0.7, f"Vectorizing {len(parsed_files)} code chunks...")
-                vectors = vectorizer.vectorize_code(parsed_files)
+                # Parse files and vectorize the chunks as they are produced
+                logger.info("Parsing and vectorizing code files...")
+                update_progress("repo_processing", 0.55, f"Parsing and vectorizing {len(code_files)} code files...")
+                vectors = vectorizer.vectorize_code(code_parser.parse_files(code_files))
+                logger.info(f"Parsed into {len(vectors['metadata'])} chunks")
                 
                 logger.info("Creating FAISS index...")
                 update_progress("repo_processing", 0.8, "Creating FAISS index...")
                 faiss_index = FAISSIndex(config.index_dir, config.dimension)
-                faiss_index.create_index(vectors, parsed_files)
+                faiss_index.create_index(vectors, vectors['metadata'])
                 logger.info("FAISS index created successfully")
         else:
             # Full indexing
             logger.info("Performing full indexing...")
             update_progress("repo_processing", 0.5, "Performing full indexing...")
             
-            # Parse files
-            logger.info("Parsing files...")
-            update_progress("repo_processing", 0.55, f"Parsing {len(code_files)} code files...")
-            parsed_files = code_parser.parse_files(code_files)
-            logger.info(f"Parsed into {len(parsed_files)} chunks")
-            
-            # Vectorize and create FAISS index
-            logger.info("Vectorizing code chunks...")
-            update_progress("repo_processing", 0.7, f"Vectorizing {len(parsed_files)} code chunks...")
-            vectors = vectorizer.vectorize_code(parsed_files)
+            # Parse files and vectorize the chunks as they are produced
+            logger.info("Parsing and vectorizing code files...")
+            update_progress("repo_processing", 0.55, f"Parsing and vectorizing {len(code_files)} code files...")
+            vectors = vectorizer.vectorize_code(code_parser.parse_files(code_files))
+            logger.info(f"Parsed into {len(vectors['metadata'])} chunks")
             
             logger.info("Creating FAISS index...")
             update_progress("repo_processing", 0.8, "Creating FAISS index...")
             faiss_index = FAISSIndex(config.index_dir, config.dimension)
-            faiss_index.create_index(vectors, parsed_files)
+            faiss_index.create_index(vectors, vectors['metadata'])
             logger.info("FAISS index created successfully")
         
         # Initialize hybrid search
@@ -398,16 +405,6 @@ def clone_repo():
             logger.error(f"Error analyzing code structure: {e}")
             code_structure = None
         
-        # Analyze dependencies
-        logger.info("Analyzing dependencies...")
-        update_progress("repo_processing", 0.95, "Analyzing dependencies...")
-        try:
-            dependency_data = analyze_dependencies(str(repo_path))
-            logger.info("Dependency analysis complete")
-        except Exception as e:
-            logger.error(f"Error analyzing dependencies: {e}")
-            dependency_data = None
-        
         # Save application state
         save_app_state()
         
@@ -460,7 +457,7 @@ def get_dependency_data():
     
     if not dependency_data and repo_handler and repo_handler.repo_path.exists():
         try:
-            dependency_data = analyze_dependencies(str(repo_handler.repo_path))
+            dependency_data = analyze_dependencies(str(repo_handler.repo_path), config.index_dir)
         except Exception as e:
             logger.error(f"Error analyzing dependencies: {e}")
             return jsonify({
@@ -636,7 +633,7 @@ def generate_tests():
         if code_generator is None:
             if llm_generator is None:
                 llm_generator = LLMGenerator(config.llm_model)
-            code_generator = CodeGenerator(llm_generator)
+            code_generator = CodeGenerator(llm_generator, config.responses_dir)
         
         # Get file content
         full_path = os.path.join(repo_handler.repo_path, file_path)
@@ -695,7 +692,7 @@ def generate_docs():
         if code_generator is None:
             if llm_generator is None:
                 llm_generator = LLMGenerator(config.llm_model)
-            code_generator = CodeGenerator(llm_generator)
+            code_generator = CodeGenerator(llm_generator, config.responses_dir)
         
         # Get file content
         full_path = os.path.join(repo_handler.repo_path, file_path)
@@ -755,7 +752,7 @@ def explain_code():
         if code_generator is None:
             if llm_generator is None:
                 llm_generator = LLMGenerator(config.llm_model)
-            code_generator = CodeGenerator(llm_generator)
+            code_generator = CodeGenerator(llm_generator, config.responses_dir)
         
         # Start operation
         operation_id = "code_explanation"
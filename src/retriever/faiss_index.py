@@ -3,7 +3,7 @@ FAISS index module for vector similarity search.
 """
 import os
 import pickle
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Set
 
 import numpy as np
 import faiss
@@ -22,6 +22,9 @@ class FAISSIndex:
         self.dimension = dimension
         self.index = None
         self.metadata = None
+        self.ids = None  # FAISS id of each metadata entry, in the same order
+        self.next_id = 0
+        self._positions = None  # FAISS id -> metadata position, built on first search
         
     def create_index(self, vectors: Dict[str, Any], metadata: List[Dict[str, Any]]) -> None:
         """
@@ -31,17 +34,55 @@ class FAISSIndex:
             vectors: Dictionary containing embeddings and metadata
             metadata: List of metadata for the indexed items
         """
-        embeddings = vectors['embeddings']
-        self.metadata = metadata
+        embeddings = np.array(vectors['embeddings']).astype('float32')
+        self.metadata = list(metadata)
         
-        # Create a new index
-        self.index = faiss.IndexFlatL2(self.dimension)
+        # Create a new index; the id map lets entries be removed and added in place later
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatL2(self.dimension))
+        self.ids = np.arange(len(self.metadata), dtype='int64')
+        self.next_id = len(self.metadata)
+        self._positions = None
         
         # Add vectors to the index
-        self.index.add(np.array(embeddings).astype('float32'))
+        self.index.add_with_ids(embeddings, self.ids)
         
         # Save the index and metadata
         self._save_index()
+    
+    def update(
+        self, 
+        remove_paths: Set[str], 
+        embeddings: np.ndarray = None, 
+        metadata: List[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Update the index in place, removing the entries of some files and adding new ones.
+        
+        Args:
+            remove_paths: Paths of the files whose entries are removed
+            embeddings: Embeddings to add, if any
+            metadata: Metadata of the embeddings to add
+        """
+        if remove_paths:
+            keep = np.fromiter(
+                (meta['path'] not in remove_paths for meta in self.metadata), 
+                dtype=bool, 
+                count=len(self.metadata)
+            )
+            if not keep.all():
+                self.index.remove_ids(faiss.IDSelectorBatch(self.ids[~keep]))
+                self.metadata = [meta for meta, kept in zip(self.metadata, keep.tolist()) if kept]
+                self.ids = self.ids[keep]
+        
+        if metadata:
+            new_ids = np.arange(self.next_id, self.next_id + len(metadata), dtype='int64')
+            self.index.add_with_ids(np.array(embeddings).astype('float32'), new_ids)
+            self.metadata.extend(metadata)
+            self.ids = np.concatenate([self.ids, new_ids])
+            self.next_id += len(metadata)
+        
+        self._positions = None
+        self._save_index()
         
     def load_index(self) -> bool:
         """
@@ -60,7 +101,18 @@ class FAISSIndex:
             self.index = faiss.read_index(index_path)
             
             with open(metadata_path, 'rb') as f:
-                self.metadata = pickle.load(f)
+                saved = pickle.load(f)
+            
+            if isinstance(saved, list):
+                # Flat index saved by earlier versions; rebuild it with an id map once
+                self.metadata = saved
+                embeddings = self.index.reconstruct_n(0, self.index.ntotal)
+                self.create_index({'embeddings': embeddings}, saved)
+            else:
+                self.metadata = saved['metadata']
+                self.ids = saved['ids']
+                self.next_id = saved['next_id']
+                self._positions = None
                 
             return True
         except Exception as e:
@@ -88,11 +140,16 @@ class FAISSIndex:
         # Search the index
         distances, indices = self.index.search(query_vector, k)
         
+        # Map FAISS ids back to metadata positions
+        if self._positions is None:
+            self._positions = {int(faiss_id): pos for pos, faiss_id in enumerate(self.ids)}
+        
         # Prepare results
         results = []
         for i, idx in enumerate(indices[0]):
-            if idx != -1 and idx < len(self.metadata):  # -1 means no result
-                result = self.metadata[idx].copy()
+            pos = self._positions.get(int(idx))  # -1 means no result
+            if pos is not None:
+                result = self.metadata[pos].copy()
                 result['score'] = float(1.0 / (1.0 + distances[0][i]))  # Convert distance to a score
                 results.append(result)
         
@@ -108,6 +165,10 @@ class FAISSIndex:
         # Save the FAISS index
         faiss.write_index(self.index, index_path)
         
-        # Save the metadata
+        # Save the metadata with the FAISS id of each entry
         with open(metadata_path, 'wb') as f:
-            pickle.dump(self.metadata, f)
\ No newline at end of file
+            pickle.dump({
+                'metadata': self.metadata,
+                'ids': self.ids,
+                'next_id': self.next_id
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
\ No newline at end of file
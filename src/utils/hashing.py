@@ -0,0 +1,66 @@
+"""
+Content hashing helpers used to detect changed files between indexing runs.
+"""
+import hashlib
+
+try:
+    # SIMD-accelerated and multi-GB/s; much faster than the hashlib digests on large repos
+    import blake3
+except ImportError:
+    blake3 = None
+
+# Digest size in bytes; 128 bits is plenty to tell file versions apart
+HASH_DIGEST_SIZE = 16
+
+# Characters of text encoded and hashed at a time, bounding the temporary bytes copy
+HASH_CHUNK_CHARS = 1024 * 1024
+
+def _new_hasher():
+    """Create an incremental hasher for content_hash/text_hash."""
+    if blake3 is not None:
+        return blake3.blake3()
+    return hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+
+def _hexdigest(hasher) -> str:
+    """Get the hex digest of a hasher created by _new_hasher."""
+    if blake3 is not None:
+        return hasher.hexdigest(length=HASH_DIGEST_SIZE)
+    return hasher.hexdigest()
+
+def content_hash(data: bytes) -> str:
+    """
+    Hash file content.
+
+    Uses BLAKE3 when installed and falls back to BLAKE2b, which is still
+    faster than MD5 on 64-bit CPUs.
+
+    Args:
+        data: File content as bytes
+
+    Returns:
+        Hex digest of the content
+    """
+    hasher = _new_hasher()
+    hasher.update(data)
+    return _hexdigest(hasher)
+
+def text_hash(text: str) -> str:
+    """
+    Hash decoded file content.
+
+    The text is UTF-8 encoded a chunk at a time, so the full bytes copy is never
+    held alongside the string. The digest equals content_hash(text.encode()).
+
+    Args:
+        text: File content as a string
+
+    Returns:
+        Hex digest of the content
+    """
+    if len(text) <= HASH_CHUNK_CHARS:
+        return content_hash(text.encode('utf-8', 'surrogatepass'))
+
+    hasher = _new_hasher()
+    for start in range(0, len(text), HASH_CHUNK_CHARS):
+        hasher.update(text[start:start + HASH_CHUNK_CHARS].encode('utf-8', 'surrogatepass'))
+    return _hexdigest(hasher)
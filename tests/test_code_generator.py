@@ -0,0 +1,117 @@
+"""
+Tests for the code generator's prompt preparation.
+"""
+import os
+import time
+
+from generator.code_generator import (
+    MAX_CODE_CHARS, RESPONSE_CACHE_TTL, CodeGenerator, FuncInfo, extract_code_elements
+)
+
+
+def _many_functions(count):
+    return "".join(f"def function_{i}(a, b):\n    return a + b * {i}\n\n" for i in range(count))
+
+
+def test_slice_relevant_stays_within_max_chars():
+    code = _many_functions(600)
+    functions, classes = extract_code_elements(code, "python")
+    
+    sliced = CodeGenerator(None)._slice_relevant(code, functions, classes)
+    
+    assert len(code) > MAX_CODE_CHARS
+    assert len(sliced) <= MAX_CODE_CHARS
+    assert sliced.startswith("def function_0(a, b):")
+
+
+def test_slice_relevant_does_not_mark_blank_gaps():
+    code = _many_functions(600)
+    functions, classes = extract_code_elements(code, "python")
+    
+    sliced = CodeGenerator(None)._slice_relevant(code, functions, classes)
+    
+    # Only the cut at the end is marked; the blank lines between functions are kept as is
+    assert sliced.count("lines elided") == 1
+    assert "\n\ndef function_1(a, b):" in sliced
+
+
+def test_slice_relevant_charges_markers_to_the_budget():
+    filler = "x = 1  # module level statement\n" * 40
+    code = "".join(f"def f{i}():\n    pass\n{filler}" for i in range(20))
+    functions = [FuncInfo(name=f"f{i}", line_start=i * 42 + 1, line_end=i * 42 + 2) for i in range(20)]
+    
+    for max_chars in (100, 200, 300, 500):
+        sliced = CodeGenerator(None)._slice_relevant(code, functions, [], max_chars=max_chars)
+        assert len(sliced) <= max_chars
+        assert "lines elided" in sliced
+
+
+def test_slice_relevant_keeps_gaps_shorter_than_a_marker():
+    code = "".join(f"def f{i}():\n    pass\ny = {i}\n" for i in range(400))
+    functions = [FuncInfo(name=f"f{i}", line_start=i * 3 + 1, line_end=i * 3 + 2) for i in range(400)]
+    
+    sliced = CodeGenerator(None)._slice_relevant(code, functions, [], max_chars=1000)
+    
+    assert "y = 0\ndef f1():" in sliced
+    assert sliced.count("lines elided") == 1
+    assert len(sliced) <= 1000
+
+
+def test_slice_relevant_returns_short_code_unchanged():
+    code = "def f():\n    pass\n"
+    
+    assert CodeGenerator(None)._slice_relevant(code, [], []) == code
+
+
+class _FakeLLM:
+    def __init__(self, model_name, use_llama_cpp=True):
+        self.model_name = model_name
+        self.use_llama_cpp = use_llama_cpp
+
+
+def test_response_key_depends_on_model_and_backend():
+    code = "def f():\n    return 1\n"
+    key = CodeGenerator(_FakeLLM("model-a"))._response_key("tests", "python", code, "a.py")
+    
+    assert key == CodeGenerator(_FakeLLM("model-a"))._response_key("tests", "python", code, "a.py")
+    assert key != CodeGenerator(_FakeLLM("model-b"))._response_key("tests", "python", code, "a.py")
+    assert key != CodeGenerator(_FakeLLM("model-a", False))._response_key("tests", "python", code, "a.py")
+
+
+def test_only_tests_are_keyed_on_the_path():
+    generator = CodeGenerator(_FakeLLM("model"))
+    code = "def f():\n    return 1\n"
+    
+    assert (generator._response_key("tests", "python", code, "pkg/a/utils.py")
+            != generator._response_key("tests", "python", code, "pkg/b/utils.py"))
+    assert (generator._response_key("documentation", "python", code, "pkg/a/utils.py")
+            == generator._response_key("documentation", "python", code, "pkg/b/utils.py"))
+
+
+def test_expired_responses_are_removed(tmp_path):
+    expired = tmp_path / "expired.txt"
+    expired.write_text("old")
+    old = time.time() - RESPONSE_CACHE_TTL - 60
+    os.utime(expired, (old, old))
+    generator = CodeGenerator(_FakeLLM("model"), cache_dir=str(tmp_path))
+    
+    assert generator._cached_response("expired") is None
+    assert not expired.exists()
+    
+    expired.write_text("old")
+    os.utime(expired, (old, old))
+    generator._store_response("fresh", "new")
+    
+    assert not expired.exists()
+    assert (tmp_path / "fresh.txt").read_text() == "new"
+
+
+def test_generate_for_files_runs_each_task():
+    llm = _FakeLLM("model")
+    prompts = []
+    llm.generate = lambda prompt, context: prompts.append(prompt) or f"response {len(prompts)}"
+    
+    results = CodeGenerator(llm).generate_for_files({"a.py": "def f():\n    return 1\n"})
+    
+    assert results == {"a.py": {"tests": "response 1", "documentation": "response 2", "explanation": "response 3"}}
+    assert "comprehensive tests" in prompts[0]
@@ -0,0 +1,28 @@
+"""
+Tests for extracting file dependencies.
+"""
+from indexer.dependencies import DependencyAnalyzer
+
+
+def test_javascript_imports_and_requires_are_all_found(tmp_path):
+    for name in ("a", "b", "c", "d"):
+        (tmp_path / f"{name}.js").write_text("")
+    content = (
+        "import a from './a'\n"
+        "const b = require('./b')\n"
+        "import { c } from './c'\n"
+        "import d from './d'; const e = require('lodash')\n"
+    )
+    
+    info = DependencyAnalyzer(str(tmp_path))._analyze_javascript_file("main.js", content)
+    
+    assert info["imports"] == ["./a", "./b", "./c", "./d", "lodash"]
+    assert info["dependencies"] == ["a.js", "b.js", "c.js", "d.js", "external/lodash"]
+
+
+def test_require_between_imports_is_not_swallowed(tmp_path):
+    content = "import a from './a'\nconst b = require('./b')\nimport c from './c'\n"
+    
+    info = DependencyAnalyzer(str(tmp_path))._analyze_javascript_file("main.js", content)
+    
+    assert info["imports"] == ["./a", "./b", "./c"]
@@ -0,0 +1,65 @@
+"""
+Tests for in-place updates and loading of the FAISS index.
+"""
+import os
+import pickle
+
+import faiss
+import numpy as np
+
+from retriever.faiss_index import FAISSIndex
+
+
+DIMENSION = 4
+
+
+def _vectors(count, offset=0):
+    return np.arange(offset * DIMENSION, (offset + count) * DIMENSION, dtype='float32').reshape(count, DIMENSION)
+
+
+def _metadata(*paths):
+    return [{'path': path, 'content': f"chunk of {path}"} for path in paths]
+
+
+def test_update_replaces_entries_of_changed_files(tmp_path):
+    index = FAISSIndex(str(tmp_path), dimension=DIMENSION)
+    index.create_index({'embeddings': _vectors(3)}, _metadata("a.py", "b.py", "c.py"))
+    
+    index.update({"b.py"}, _vectors(1, offset=10), _metadata("b.py"))
+    
+    assert index.index.ntotal == 3
+    assert [meta['path'] for meta in index.metadata] == ["a.py", "c.py", "b.py"]
+    assert index.ids.tolist() == [0, 2, 3]
+    assert index.search(_vectors(1, offset=10)[0], k=1)[0]['path'] == "b.py"
+    assert index.search(_vectors(1, offset=2)[0], k=1)[0]['path'] == "c.py"
+
+
+def test_update_survives_reload(tmp_path):
+    index = FAISSIndex(str(tmp_path), dimension=DIMENSION)
+    index.create_index({'embeddings': _vectors(2)}, _metadata("a.py", "b.py"))
+    index.update({"a.py"})
+    
+    loaded = FAISSIndex(str(tmp_path), dimension=DIMENSION)
+    
+    assert loaded.load_index()
+    assert [meta['path'] for meta in loaded.metadata] == ["b.py"]
+    assert loaded.next_id == 2
+    assert loaded.search(_vectors(1, offset=1)[0], k=1)[0]['path'] == "b.py"
+
+
+def test_load_index_migrates_legacy_flat_index(tmp_path):
+    # Earlier versions saved a plain flat index and a bare metadata list
+    flat = faiss.IndexFlatL2(DIMENSION)
+    flat.add(_vectors(2))
+    faiss.write_index(flat, os.path.join(tmp_path, 'faiss_index.bin'))
+    with open(os.path.join(tmp_path, 'metadata.pkl'), 'wb') as f:
+        pickle.dump(_metadata("a.py", "b.py"), f)
+    
+    index = FAISSIndex(str(tmp_path), dimension=DIMENSION)
+    
+    assert index.load_index()
+    assert index.ids.tolist() == [0, 1]
+    index.update({"a.py"})
+    assert index.search(_vectors(1, offset=1)[0], k=2)[0]['path'] == "b.py"
+    with open(os.path.join(tmp_path, 'metadata.pkl'), 'rb') as f:
+        assert isinstance(pickle.load(f), dict)
@@ -0,0 +1,50 @@
+"""
+Tests for the incremental indexer's change tracking.
+"""
+from indexer.incremental import IncrementalIndexer
+
+
+def test_file_hashes_round_trip():
+    file_hashes = {
+        "src/main.py": "00112233445566778899aabbccddeeff",
+        "src\\ünïcode.py": "ffeeddccbbaa99887766554433221100",
+    }
+    
+    packed = IncrementalIndexer._pack_file_hashes(file_hashes)
+    
+    assert IncrementalIndexer._unpack_file_hashes(packed) == file_hashes
+    assert IncrementalIndexer._unpack_file_hashes(b"") == {}
+
+
+def test_add_dependents_marks_transitive_dependents(tmp_path):
+    indexer = IncrementalIndexer(str(tmp_path), str(tmp_path / "index"))
+    indexer.save_dependencies({
+        "app.py": ["service.py", "external/flask"],
+        "service.py": ["models.py"],
+        "models.py": [],
+        "unrelated.py": [],
+    })
+    indexer.changed_files = {"models.py"}
+    
+    indexer._add_dependents({"app.py": "1", "service.py": "2", "models.py": "3", "unrelated.py": "4"})
+    
+    assert indexer.changed_files == {"models.py", "service.py", "app.py"}
+
+
+def test_add_dependents_matches_windows_paths(tmp_path):
+    indexer = IncrementalIndexer(str(tmp_path), str(tmp_path / "index"))
+    indexer.save_dependencies({"pkg/app.py": ["pkg/models.py"]})
+    indexer.deleted_files = {"pkg\\models.py"}
+    
+    indexer._add_dependents({"pkg\\app.py": "1"})
+    
+    assert indexer.changed_files == {"pkg\\app.py"}
+
+
+def test_saved_dependencies_are_loaded(tmp_path):
+    IncrementalIndexer(str(tmp_path), str(tmp_path / "index")).save_dependencies({"app.py": ["models.py"]})
+    
+    indexer = IncrementalIndexer(str(tmp_path), str(tmp_path / "index"))
+    indexer.initialize()
+    
+    assert indexer.reverse_deps == {"models.py": {"app.py"}}
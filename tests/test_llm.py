@@ -0,0 +1,45 @@
+"""
+Tests for fitting retrieved context into the LLM prompt.
+"""
+from generator.llm import (
+    CHARS_PER_TOKEN, CONTEXT_WINDOW_TOKENS, MAX_NEW_TOKENS, LLMGenerator, _context_char_limits, _truncate_context
+)
+
+
+def test_context_char_limits_share_leftover_budget():
+    limits = _context_char_limits(["a" * 10, "b" * 500, "c" * 300], 400)
+    
+    assert limits == [10, 195, 195]
+    assert sum(limits) <= 400
+
+
+def test_context_char_limits_keep_short_items_whole():
+    assert _context_char_limits(["a" * 10, "b" * 20], 100) == [10, 20]
+
+
+def test_truncate_context_cuts_at_line_boundary_and_closes_fence():
+    content = "```python\n" + "".join(f"line {i}\n" for i in range(100)) + "```"
+    
+    truncated = _truncate_context(content, 60)
+    
+    assert len(truncated) <= 60
+    assert truncated.startswith("```python\nline 0\n")
+    assert truncated.endswith("\n```")
+    assert "line 99" not in truncated
+
+
+def test_truncate_context_leaves_short_content_alone():
+    assert _truncate_context("short", 100) == "short"
+
+
+def test_prompt_fits_context_window_with_room_for_the_answer():
+    context = [
+        {'path': f"src/module_{i}.py", 'start_line': 1, 'end_line': 400, 'content': "x = 1\n" * 3000}
+        for i in range(5)
+    ]
+    question = "Write tests for this code. " * 40
+    
+    prompt = LLMGenerator("model", preload=False)._create_prompt(question, context)
+    
+    assert len(prompt) <= (CONTEXT_WINDOW_TOKENS - MAX_NEW_TOKENS) * CHARS_PER_TOKEN
+    assert prompt.count("... (truncated)") == 5
@@ -0,0 +1,44 @@
+"""
+Tests for splitting code files into chunks.
+"""
+from indexer.parser import CodeParser
+
+
+def _function(name, start_line, end_line):
+    return {'name': name, 'start_line': start_line, 'end_line': end_line}
+
+
+def test_definition_sections_cover_the_file():
+    module_info = {
+        'functions': [_function("helper", 20, 24), _function("main", 4, 10)],
+        'classes': [_function("Model", 12, 18)],
+    }
+    
+    sections = CodeParser()._get_definition_sections(module_info, 30)
+    
+    assert sections == [(1, 3), (4, 10), (11, 11), (12, 18), (19, 19), (20, 24), (25, 30)]
+
+
+def test_definition_sections_skip_stale_definitions():
+    module_info = {
+        'functions': [_function("main", 1, 10), _function("nested", 5, 6), _function("gone", 50, 60)],
+        'classes': [],
+    }
+    
+    sections = CodeParser()._get_definition_sections(module_info, 12)
+    
+    assert sections == [(1, 10), (11, 12)]
+
+
+def test_python_chunks_follow_definitions_with_windows_paths():
+    content = "import os\n\n" + "def f():\n    return 1\n\n" + "def g():\n    return 2\n"
+    module_info = {
+        'functions': [_function("f", 3, 4), _function("g", 6, 7)],
+        'classes': [],
+    }
+    parser = CodeParser({"pkg/mod.py": module_info})
+    
+    chunks = list(parser.parse_files([{'path': "pkg\\mod.py", 'extension': ".py", 'content': content}]))
+    
+    assert [chunk['start_line'] for chunk in chunks] == [1, 3, 6]
+    assert chunks[1]['content'] == "def f():\n    return 1"